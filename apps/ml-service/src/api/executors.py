@@ -0,0 +1,267 @@
+"""
+Model Execution Layer
+Sized worker pools per model family with coherent intra-op thread limits
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+
+DEFAULT_WORKERS = {
+    'sentiment': 1,
+    'productivity': 2,
+    'engagement': 2,
+    'anomaly': 2,
+    'benchmark': 2
+}
+
+# Families whose model calls parallelize inside an op (torch/ONNX); the
+# others do elementwise NumPy work that intra-op threads do not speed up
+INTRA_OP_FAMILIES = ('sentiment',)
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS"
+)
+
+
+def configure_intra_op_threads(num_threads: int):
+    """
+    Limit torch, BLAS and OpenMP thread pools in the current process
+
+    Environment variables cover libraries that have not initialized their
+    pools yet; threadpoolctl and torch.set_num_threads resize the ones
+    that already have.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(num_threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=num_threads)
+    except ImportError:
+        pass
+
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+def _init_process_worker():
+    """Give a pool process single-threaded math libraries"""
+    # Set before the worker imports the API module, whose executors read it
+    os.environ["ML_INTRA_OP_THREADS"] = "1"
+    configure_intra_op_threads(1)
+
+
+def _invoke(factory: Callable, method: str, args: tuple, kwargs: dict):
+    """Resolve a model from its factory and call one of its methods"""
+    return getattr(factory(), method)(*args, **kwargs)
+
+
+def _warm_up_worker(factory: Callable, warmup: Optional[Callable], barrier=None) -> Dict:
+    """
+    Load a worker's model and run its warm-up inference
+
+    With a barrier the call holds its worker until every worker of the pool
+    has warmed up, so each call of a warm-up round lands on its own process.
+    """
+    try:
+        started = time.perf_counter()
+        model = factory()
+        timings = {'load_seconds': round(time.perf_counter() - started, 3), 'warmup_seconds': None}
+
+        if warmup is not None:
+            started = time.perf_counter()
+            warmup(model)
+            timings['warmup_seconds'] = round(time.perf_counter() - started, 3)
+    except BaseException:
+        if barrier is not None:
+            barrier.abort()
+        raise
+
+    if barrier is not None:
+        barrier.wait()
+    return timings
+
+
+class ModelExecutors:
+    """
+    Dedicated executor per model family
+
+    Each family gets its own thread pool (or, for GIL-bound work, process
+    pool) so a burst on one model cannot starve the others. Intra-op thread
+    limits are process-wide, so the default splits the cores between the
+    thread-pool workers of intra-op parallel families that can run model
+    calls at once; process pool workers run single-threaded.
+    """
+
+    def __init__(
+        self,
+        factories: Dict[str, Callable],
+        workers: Optional[Dict[str, int]] = None,
+        process_families: tuple = (),
+        intra_op_threads: Optional[int] = None,
+        intra_op_families: tuple = INTRA_OP_FAMILIES
+    ):
+        """
+        Initialize executors
+
+        Args:
+            factories: Model family name -> zero-argument model factory
+            workers: Model family name -> pool size
+            process_families: Families served by a process pool
+            intra_op_threads: Torch/BLAS threads per worker in this process
+                (defaults to cores divided by concurrent thread-pool workers
+                of intra_op_families)
+            intra_op_families: Families whose calls use intra-op threads
+        """
+        self.factories = factories
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.process_families = set(process_families)
+
+        cpu_count = os.cpu_count() or 1
+        concurrent_workers = sum(
+            self.workers.get(family, 1)
+            for family in factories
+            if family in intra_op_families and family not in self.process_families
+        )
+        self.intra_op_threads = intra_op_threads or max(1, cpu_count // max(1, concurrent_workers))
+        configure_intra_op_threads(self.intra_op_threads)
+
+        # Process pool workers come from a forkserver: forking this process,
+        # which already runs torch/OpenMP threads, can deadlock on their locks
+        self._mp_context = multiprocessing.get_context("forkserver")
+
+        self._pools = {}
+        for family in factories:
+            size = self.workers.get(family, 1)
+            if family in self.process_families:
+                # Each process handles one request at a time, so its own
+                # math libraries get a single thread
+                self._pools[family] = ProcessPoolExecutor(
+                    max_workers=size,
+                    mp_context=self._mp_context,
+                    initializer=_init_process_worker
+                )
+            else:
+                self._pools[family] = ThreadPoolExecutor(
+                    max_workers=size,
+                    thread_name_prefix=f"ml-{family}"
+                )
+
+    @classmethod
+    def from_env(cls, factories: Dict[str, Callable]) -> "ModelExecutors":
+        """
+        Build executors from environment configuration
+
+        Reads <FAMILY>_WORKERS and <FAMILY>_EXECUTOR (thread or process) for
+        each family, plus ML_INTRA_OP_THREADS and ML_INTRA_OP_FAMILIES
+        (comma-separated).
+        """
+        workers = {}
+        process_families = []
+        for family in factories:
+            prefix = family.upper()
+            workers[family] = int(os.getenv(f"{prefix}_WORKERS", DEFAULT_WORKERS.get(family, 1)))
+            if os.getenv(f"{prefix}_EXECUTOR", "thread") == "process":
+                process_families.append(family)
+
+        intra_op_threads = os.getenv("ML_INTRA_OP_THREADS")
+        intra_op_families = os.getenv("ML_INTRA_OP_FAMILIES", ",".join(INTRA_OP_FAMILIES))
+
+        return cls(
+            factories,
+            workers=workers,
+            process_families=tuple(process_families),
+            intra_op_threads=int(intra_op_threads) if intra_op_threads else None,
+            intra_op_families=tuple(name.strip() for name in intra_op_families.split(",") if name.strip())
+        )
+
+    async def call(self, family: str, method: str, *args, **kwargs):
+        """
+        Call a model method on the family's executor
+
+        Args:
+            family: Model family name
+            method: Name of the model method to call
+            *args, **kwargs: Arguments for the method
+
+        Returns:
+            The method's return value
+        """
+        loop = asyncio.get_running_loop()
+        task = partial(_invoke, self.factories[family], method, args, kwargs)
+        return await loop.run_in_executor(self._pools[family], task)
+
+    async def warm_up(self, family: str, warmup: Optional[Callable] = None) -> Dict:
+        """
+        Load a family's model, and run a warm-up inference, where it serves
+
+        A thread pool shares this process's model, so it is warmed up once.
+        A process pool is warmed up in every worker: one call per worker is
+        submitted and each holds its process until all have warmed up.
+
+        Args:
+            family: Model family name
+            warmup: Picklable function called with the loaded model
+
+        Returns:
+            Slowest load and warm-up time in seconds across workers
+        """
+        loop = asyncio.get_running_loop()
+        factory = self.factories[family]
+        pool = self._pools[family]
+
+        if family not in self.process_families:
+            return await loop.run_in_executor(pool, _warm_up_worker, factory, warmup)
+
+        size = self.workers.get(family, 1)
+        with self._mp_context.Manager() as manager:
+            barrier = manager.Barrier(size)
+            results = await asyncio.gather(*[
+                loop.run_in_executor(pool, _warm_up_worker, factory, warmup, barrier)
+                for _ in range(size)
+            ], return_exceptions=True)
+
+        # A failed worker breaks the barrier for the rest; report its error
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise next((e for e in errors if not isinstance(e, threading.BrokenBarrierError)), errors[0])
+
+        return {
+            field: max((result[field] for result in results if result[field] is not None), default=None)
+            for field in ('load_seconds', 'warmup_seconds')
+        }
+
+    def set_intra_op_threads(self, num_threads: int):
+        """Change the intra-op thread count for this process"""
+        self.intra_op_threads = num_threads
+        configure_intra_op_threads(num_threads)
+
+    def config(self) -> Dict:
+        """Get the active pool configuration"""
+        return {
+            'intra_op_threads': self.intra_op_threads,
+            'pools': {
+                family: {
+                    'workers': self.workers.get(family, 1),
+                    'kind': 'process' if family in self.process_families else 'thread'
+                }
+                for family in self._pools
+            }
+        }
+
+    def shutdown(self):
+        """Stop all pools"""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,126 @@
+"""
+Pre-fork Launcher
+Serves the ML API from several worker processes that share loaded models
+"""
+
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Callable, List, Optional
+
+import uvicorn
+
+from api.executors import configure_intra_op_threads
+
+
+def _bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+    """Serve requests on the shared socket until signalled"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, log_level=log_level)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def serve_prefork(
+    app,
+    host: str,
+    port: int,
+    workers: int,
+    preload: List[Callable],
+    intra_op_threads: Optional[int] = None,
+    log_level: str = "info"
+):
+    """
+    Load models once, then fork workers that share them copy-on-write
+
+    Model weights are loaded in the parent before forking, so every worker
+    maps the same physical pages instead of holding its own copy. The
+    garbage collector is frozen after loading so reference-count and GC
+    bookkeeping in workers does not touch (and un-share) those pages.
+    Workers that exit unexpectedly are replaced.
+
+    Forking a process that runs torch/OpenMP worker threads can deadlock
+    the child on locks those threads held, so math libraries are limited
+    to one thread while models load and each worker restores its own
+    thread count after the fork. Preload factories must therefore not
+    start threads of their own (an ONNX Runtime session creates its thread
+    pool with the session), and models served from process pools gain
+    nothing from preloading.
+
+    Args:
+        app: ASGI application to serve
+        host: Bind address
+        port: Bind port
+        workers: Number of worker processes
+        preload: Model factories to call before forking
+        intra_op_threads: Torch/BLAS threads per worker (defaults to the
+            cores divided between workers)
+        log_level: Uvicorn log level
+    """
+    intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // workers)
+
+    configure_intra_op_threads(1)
+    for factory in preload:
+        factory()
+
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind_socket(host, port)
+    children = {}
+    shutting_down = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                configure_intra_op_threads(intra_op_threads)
+                _run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        started = children.pop(pid, None)
+        if not shutting_down and started is not None:
+            # Back off if workers are crashing on startup
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)
+            spawn()
+
+    sock.close()
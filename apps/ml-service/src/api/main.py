@@ -3,13 +3,18 @@ ML Service FastAPI Application
 Provides ML prediction endpoints for PMS
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
+import asyncio
+import json
+import threading
 import uvicorn
 import os
 import sys
+import tempfile
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -17,8 +22,10 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from models.sentiment_analyzer import SentimentAnalyzer
 from models.productivity_predictor import ProductivityPredictor
 from models.engagement_scorer import EngagementScorer
+from models.engagement_state import EngagementStateStore
 from models.anomaly_detector import AnomalyDetector
 from models.performance_benchmarker import PerformanceBenchmarker
+from api.executors import ModelExecutors
 
 app = FastAPI(
     title="PMS ML Service",
@@ -42,44 +49,253 @@ _engagement_scorer = None
 _anomaly_detector = None
 _performance_benchmarker = None
 
+# Guards against concurrent first loads (warm-up racing a request)
+_model_locks = {
+    name: threading.Lock()
+    for name in ('sentiment', 'productivity', 'engagement', 'anomaly', 'benchmark')
+}
+
 def get_sentiment_analyzer():
     global _sentiment_analyzer
     if _sentiment_analyzer is None:
-        _sentiment_analyzer = SentimentAnalyzer()
+        with _model_locks['sentiment']:
+            if _sentiment_analyzer is None:
+                _sentiment_analyzer = SentimentAnalyzer(
+                    batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", 32)),
+                    max_batch_tokens=int(os.getenv("SENTIMENT_MAX_BATCH_TOKENS", 8192)),
+                    backend=os.getenv("SENTIMENT_BACKEND", "torch"),
+                    onnx_cache_dir=os.getenv("SENTIMENT_ONNX_CACHE_DIR"),
+                    cache_size=int(os.getenv("SENTIMENT_CACHE_SIZE", 10000)),
+                    cache_ttl_seconds=float(os.getenv("SENTIMENT_CACHE_TTL_SECONDS", 3600)),
+                    cache_redis_url=os.getenv("SENTIMENT_CACHE_REDIS_URL"),
+                    num_threads=executors.intra_op_threads
+                )
     return _sentiment_analyzer
 
 def get_productivity_predictor():
     global _productivity_predictor
     if _productivity_predictor is None:
-        _productivity_predictor = ProductivityPredictor()
-        # Load trained model if exists
-        model_path = os.getenv("PRODUCTIVITY_MODEL_PATH")
-        if model_path and os.path.exists(model_path):
-            _productivity_predictor.load_model(model_path)
+        with _model_locks['productivity']:
+            if _productivity_predictor is None:
+                predictor = ProductivityPredictor(
+                    use_compiled_engine=os.getenv("TREE_INFERENCE_ENGINE") == "compiled"
+                )
+                # Load trained model if exists
+                model_path = os.getenv("PRODUCTIVITY_MODEL_PATH")
+                if model_path and os.path.exists(model_path):
+                    predictor.load_model(model_path, mmap_mode=os.getenv("MODEL_MMAP_MODE"))
+                _productivity_predictor = predictor
     return _productivity_predictor
 
+def _engagement_state_db() -> Optional[str]:
+    """
+    SQLite file for engagement state (None keeps it in memory)
+
+    When several processes serve /engagement/update (pre-fork workers or an
+    engagement process pool) per-process memory would give each its own
+    user history, so state defaults to a shared file there.
+    """
+    db_path = os.getenv("ENGAGEMENT_STATE_DB")
+    if db_path:
+        return db_path
+
+    multi_process = int(os.getenv("ML_SERVICE_WORKERS", 1)) > 1 or (
+        'engagement' in executors.process_families and executors.workers.get('engagement', 1) > 1
+    )
+    if multi_process:
+        port = os.getenv("ML_SERVICE_PORT", 8001)
+        return os.path.join(tempfile.gettempdir(), f"pms-ml-engagement-{port}.db")
+    return None
+
 def get_engagement_scorer():
     global _engagement_scorer
     if _engagement_scorer is None:
-        _engagement_scorer = EngagementScorer()
+        with _model_locks['engagement']:
+            if _engagement_scorer is None:
+                state_store = EngagementStateStore(
+                    window_days=int(os.getenv("ENGAGEMENT_WINDOW_DAYS", 7)),
+                    history_size=int(os.getenv("ENGAGEMENT_HISTORY_SIZE", 32)),
+                    db_path=_engagement_state_db(),
+                    max_users=int(os.getenv("ENGAGEMENT_MAX_USERS", 100000))
+                )
+                _engagement_scorer = EngagementScorer(state_store=state_store)
     return _engagement_scorer
 
 def get_anomaly_detector():
     global _anomaly_detector
     if _anomaly_detector is None:
-        _anomaly_detector = AnomalyDetector()
-        # Load trained detector if exists
-        model_path = os.getenv("ANOMALY_MODEL_PATH")
-        if model_path and os.path.exists(model_path):
-            _anomaly_detector.load_model(model_path)
+        with _model_locks['anomaly']:
+            if _anomaly_detector is None:
+                detector = AnomalyDetector(
+                    use_compiled_engine=os.getenv("TREE_INFERENCE_ENGINE") == "compiled",
+                    neighbor_index=os.getenv("ANOMALY_NEIGHBOR_INDEX")
+                )
+                # Load trained detector if exists
+                model_path = os.getenv("ANOMALY_MODEL_PATH")
+                if model_path and os.path.exists(model_path):
+                    detector.load_model(model_path, mmap_mode=os.getenv("MODEL_MMAP_MODE"))
+                _anomaly_detector = detector
     return _anomaly_detector
 
 def get_performance_benchmarker():
     global _performance_benchmarker
     if _performance_benchmarker is None:
-        _performance_benchmarker = PerformanceBenchmarker()
+        with _model_locks['benchmark']:
+            if _performance_benchmarker is None:
+                dimensions = os.getenv("BENCHMARK_SEGMENT_DIMENSIONS", "role,department,level")
+                _performance_benchmarker = PerformanceBenchmarker(
+                    segment_dimensions=[name.strip() for name in dimensions.split(",") if name.strip()],
+                    min_sample_size=int(os.getenv("BENCHMARK_MIN_SAMPLE_SIZE", 10))
+                )
     return _performance_benchmarker
 
+MODEL_FACTORIES = {
+    'sentiment': get_sentiment_analyzer,
+    'productivity': get_productivity_predictor,
+    'engagement': get_engagement_scorer,
+    'anomaly': get_anomaly_detector,
+    'benchmark': get_performance_benchmarker
+}
+
+# Per-family worker pools for CPU-bound model calls
+executors = ModelExecutors.from_env(MODEL_FACTORIES)
+
+# Warm-up inference per model. These run inside the family's executor
+# workers, possibly in other processes, so they are module-level functions.
+# Trained models are only exercised once a fitted artifact has been loaded.
+def _warm_up_sentiment(model):
+    model.analyze("Thanks for the update, the project is on track.")
+
+def _warm_up_productivity(model):
+    if hasattr(model.scaler, 'mean_'):
+        model.predict({})
+
+def _warm_up_engagement(model):
+    model.calculate_score({})
+
+def _warm_up_anomaly(model):
+    if hasattr(model.scaler, 'mean_'):
+        model.detect({})
+
+# None means loading is enough
+WARMUP_CALLS = {
+    'sentiment': _warm_up_sentiment,
+    'productivity': _warm_up_productivity,
+    'engagement': _warm_up_engagement,
+    'anomaly': _warm_up_anomaly,
+    'benchmark': None
+}
+
+_warmup_state = {}
+
+async def _warm_up_model(name: str):
+    """Load one model and run a warm-up inference in every worker serving it"""
+    state = _warmup_state[name]
+    state['state'] = 'loading'
+
+    try:
+        state.update(await executors.warm_up(name, WARMUP_CALLS.get(name)))
+        state['state'] = 'ready'
+    except Exception as e:
+        state['state'] = 'failed'
+        state['error'] = str(e)
+
+@app.on_event("startup")
+async def start_warmup():
+    """
+    Load and warm up the models listed in ML_WARMUP_MODELS concurrently
+
+    Each model is loaded by the executor that serves it, so a family on a
+    process pool is warmed up in every pool worker. Runs in the background
+    so /health answers immediately; /ready reports 503 until every listed
+    model is loaded and warmed up.
+    """
+    names = [
+        name.strip()
+        for name in os.getenv("ML_WARMUP_MODELS", ",".join(MODEL_FACTORIES)).split(",")
+        if name.strip() in MODEL_FACTORIES
+    ]
+    for name in names:
+        _warmup_state[name] = {
+            'state': 'pending',
+            'load_seconds': None,
+            'warmup_seconds': None,
+            'error': None
+        }
+
+    if not names:
+        return
+
+    async def run_all():
+        await asyncio.gather(*[_warm_up_model(name) for name in names])
+
+    app.state.warmup_task = asyncio.get_running_loop().create_task(run_all())
+
+class SentimentBatcher:
+    """
+    Coalesces concurrent single-text sentiment requests into batched calls
+
+    Requests queue up for at most max_wait_ms (or until max_batch_size
+    texts are waiting), are analyzed together with one batch_analyze call
+    and each caller receives its own result.
+    """
+
+    def __init__(self, executors: ModelExecutors, max_wait_ms: float = 10, max_batch_size: int = 32):
+        self.executors = executors
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = None
+        self._worker = None
+
+    async def analyze(self, text: str) -> Dict:
+        """Queue a text for the next batch and wait for its result"""
+        if self.max_wait <= 0 or self.max_batch_size <= 1:
+            return await self.executors.call('sentiment', 'analyze', text)
+
+        loop = asyncio.get_running_loop()
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                results = await self.executors.call('sentiment', 'batch_analyze', texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+sentiment_batcher = SentimentBatcher(
+    executors,
+    max_wait_ms=float(os.getenv("SENTIMENT_COALESCE_WINDOW_MS", 10)),
+    max_batch_size=int(os.getenv("SENTIMENT_COALESCE_MAX_ITEMS", 32))
+)
+
 # Request/Response Models
 class SentimentRequest(BaseModel):
     text: str = Field(..., description="Text to analyze")
@@ -97,6 +313,10 @@ class SentimentResponse(BaseModel):
 class ProductivityRequest(BaseModel):
     features: Dict = Field(..., description="Feature dictionary with productivity metrics")
 
+class ProductivityBatchRequest(BaseModel):
+    records: Optional[List[Dict]] = Field(None, description="Feature dictionaries, one per person")
+    columns: Optional[Dict[str, List]] = Field(None, description="Column-oriented features: name -> values")
+
 class ProductivityResponse(BaseModel):
     predicted_score: float
     confidence: float
@@ -117,10 +337,28 @@ class EngagementResponse(BaseModel):
     risk_level: Optional[str]
     risk_factors: List[str]
 
+class EngagementUpdateRequest(BaseModel):
+    user_id: str
+    events: List[Dict] = Field(..., description="Activity deltas and current rates since the last update")
+    timestamp: Optional[float] = Field(None, description="Event time in epoch seconds (defaults to now)")
+
+class EngagementUpdateResponse(EngagementResponse):
+    ewma_score: float
+
+class EngagementBatchRequest(BaseModel):
+    records: Optional[List[Dict]] = Field(None, description="Activity metrics dictionaries, one per user")
+    columns: Optional[Dict[str, List]] = Field(None, description="Column-oriented metrics: name -> values")
+    output: Literal["records", "columns"] = Field("records", description="Response layout")
+
 class AnomalyRequest(BaseModel):
     metrics: Dict = Field(..., description="Performance and behavior metrics")
     entity_type: str = Field("USER", description="USER or TEAM")
 
+class AnomalyBatchRequest(BaseModel):
+    records: Optional[List[Dict]] = Field(None, description="Metrics dictionaries, one per entity")
+    columns: Optional[Dict[str, List]] = Field(None, description="Column-oriented metrics: name -> values")
+    entity_type: str = Field("USER", description="USER or TEAM")
+
 class AnomalyResponse(BaseModel):
     is_anomaly: bool
     anomaly_score: float
@@ -147,6 +385,8 @@ class BenchmarkResponse(BaseModel):
     strengths: List[str]
     improvement_areas: List[str]
     recommendations: List[str]
+    benchmark_level: Optional[str] = None
+    benchmark_segment: Optional[Dict] = None
 
 # API Endpoints
 @app.get("/")
@@ -161,96 +401,279 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness probe for load balancers
+
+    Returns 200 once every model selected for warm-up is loaded and has
+    served a warm-up inference, 503 otherwise, with per-model state and
+    timings.
+    """
+    ready = all(state['state'] == 'ready' for state in _warmup_state.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "models": _warmup_state
+        }
+    )
+
 @app.post("/api/ml/sentiment/analyze", response_model=SentimentResponse)
-def analyze_sentiment(
-    request: SentimentRequest,
-    analyzer: SentimentAnalyzer = Depends(get_sentiment_analyzer)
-):
+async def analyze_sentiment(request: SentimentRequest):
     """
     Analyze sentiment of text communication
 
+    Concurrent requests are coalesced into micro-batches (see SentimentBatcher).
     Returns sentiment scores, emotions, topics, and intent
     """
     try:
-        result = analyzer.analyze(request.text)
+        result = await sentiment_batcher.analyze(request.text)
         return SentimentResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/ml/sentiment/batch", response_model=List[SentimentResponse])
-def analyze_sentiment_batch(
-    texts: List[str],
-    analyzer: SentimentAnalyzer = Depends(get_sentiment_analyzer)
-):
+async def analyze_sentiment_batch(texts: List[str]):
     """
     Analyze sentiment for multiple texts in batch
     """
     try:
-        results = analyzer.batch_analyze(texts)
+        results = await executors.call('sentiment', 'batch_analyze', texts)
         return [SentimentResponse(**r) for r in results]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class _RequestBodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body
+
+    StreamingResponse normally listens for client disconnects by calling
+    receive() alongside the body iterator, and that listener drops any
+    request body chunks it receives. Here the iterator is the only reader;
+    a disconnect still ends the stream through request.stream().
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def _iter_ndjson_lines(request: Request, max_line_bytes: int):
+    """
+    Yield non-empty lines from a streamed NDJSON request body
+
+    A line longer than max_line_bytes is dropped as it arrives and None is
+    yielded in its place, so memory stays bounded by the line limit even if
+    a line never ends.
+    """
+    buffer = b""
+    oversized = False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if oversized:
+                # End of a line already reported as too long
+                oversized = False
+            elif len(line) > max_line_bytes:
+                yield None
+            elif line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            if not oversized:
+                yield None
+            oversized = True
+            buffer = b""
+    if buffer.strip() and not oversized:
+        yield buffer
+
+async def _analyze_ndjson_batch(lines: List[Optional[bytes]]) -> str:
+    """Analyze one batch of NDJSON records and serialize the results"""
+    outputs = []
+    valid = []
+    for line in lines:
+        if line is None:
+            outputs.append({"id": None, "error": "Invalid record: line exceeds the maximum size"})
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            outputs.append({"id": None, "error": f"Invalid record: {e}"})
+            continue
+
+        if not isinstance(record, dict):
+            outputs.append({"id": None, "error": "Invalid record: expected a JSON object"})
+        elif "text" not in record:
+            outputs.append({"id": record.get("id"), "error": "Invalid record: missing 'text'"})
+        else:
+            outputs.append({"id": record.get("id"), "text": str(record["text"])})
+            valid.append(len(outputs) - 1)
+
+    texts = [outputs[i].pop("text") for i in valid]
+    if texts:
+        try:
+            results = await executors.call('sentiment', 'batch_analyze', texts)
+            for i, result in zip(valid, results):
+                outputs[i].update({field: result[field] for field in SentimentResponse.model_fields})
+        except Exception as e:
+            for i in valid:
+                outputs[i]["error"] = str(e)
+
+    return "".join(json.dumps(output) + "\n" for output in outputs)
+
+async def _stream_sentiment(request: Request, batch_size: int, max_line_bytes: int):
+    batch = []
+    async for line in _iter_ndjson_lines(request, max_line_bytes):
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield await _analyze_ndjson_batch(batch)
+            batch = []
+
+    if batch:
+        yield await _analyze_ndjson_batch(batch)
+
+@app.post("/api/ml/sentiment/stream")
+async def analyze_sentiment_stream(request: Request):
+    """
+    Analyze sentiment for an NDJSON corpus, streaming NDJSON results
+
+    Each input line is {"id": ..., "text": ...}. Each output line carries the
+    same id with the sentiment fields, or an error for that record. Input is
+    read and analyzed one batch at a time as the client consumes output, so
+    memory stays bounded by the batch size regardless of corpus size. Lines
+    longer than SENTIMENT_STREAM_MAX_LINE_BYTES get an error line instead.
+    """
+    batch_size = int(os.getenv("SENTIMENT_STREAM_BATCH_SIZE", 256))
+    max_line_bytes = int(os.getenv("SENTIMENT_STREAM_MAX_LINE_BYTES", 1024 * 1024))
+    return _RequestBodyStreamingResponse(
+        _stream_sentiment(request, batch_size, max_line_bytes),
+        media_type="application/x-ndjson"
+    )
+
 @app.post("/api/ml/productivity/predict", response_model=ProductivityResponse)
-def predict_productivity(
-    request: ProductivityRequest,
-    predictor: ProductivityPredictor = Depends(get_productivity_predictor)
-):
+async def predict_productivity(request: ProductivityRequest):
     """
     Predict productivity score based on features
 
     Returns prediction with confidence interval and recommendations
     """
     try:
-        result = predictor.predict(request.features)
+        result = await executors.call('productivity', 'predict', request.features)
         return ProductivityResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ml/productivity/predict/batch", response_model=List[ProductivityResponse])
+async def predict_productivity_batch(request: ProductivityBatchRequest):
+    """
+    Predict productivity scores for many people in one model call
+
+    Accepts either a list of feature records or a column-oriented payload
+    """
+    try:
+        features = request.columns if request.columns is not None else (request.records or [])
+        results = await executors.call('productivity', 'predict_batch', features)
+        return [ProductivityResponse(**r) for r in results]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/ml/engagement/score", response_model=EngagementResponse)
-def calculate_engagement(
-    request: EngagementRequest,
-    scorer: EngagementScorer = Depends(get_engagement_scorer)
-):
+async def calculate_engagement(request: EngagementRequest):
     """
     Calculate engagement score from activity metrics
 
     Returns overall score, components, and risk assessment
     """
     try:
-        result = scorer.calculate_score(request.metrics)
+        result = await executors.call('engagement', 'calculate_score', request.metrics)
         return EngagementResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ml/engagement/update", response_model=EngagementUpdateResponse)
+async def update_engagement(request: EngagementUpdateRequest):
+    """
+    Update a user's engagement score from new activity events
+
+    The service keeps each user's rolling activity window and score
+    history, so only events since the last update need to be sent.
+    """
+    try:
+        result = await executors.call(
+            'engagement', 'update', request.user_id, request.events, request.timestamp
+        )
+        return EngagementUpdateResponse(**result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/ml/engagement/score/batch")
+async def calculate_engagement_batch(request: EngagementBatchRequest):
+    """
+    Calculate engagement scores for many users with the vectorized scorer
+
+    Accepts either a list of metrics records or a column-oriented payload.
+    With output="columns" the response is a mapping of EngagementResponse
+    field -> list of values; otherwise it is a list of EngagementResponse
+    objects. Results are serialized directly rather than validated into
+    per-user response models.
+    """
+    try:
+        metrics = request.columns if request.columns is not None else (request.records or [])
+        if request.output == "columns":
+            columns = await executors.call('engagement', 'calculate_score_columns', metrics)
+            content = {field: columns[field] for field in EngagementResponse.model_fields}
+        else:
+            results = await executors.call('engagement', 'calculate_scores', metrics)
+            content = [
+                {field: result[field] for field in EngagementResponse.model_fields}
+                for result in results
+            ]
+        return JSONResponse(content=content)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/ml/anomaly/detect", response_model=AnomalyResponse)
-def detect_anomaly(
-    request: AnomalyRequest,
-    detector: AnomalyDetector = Depends(get_anomaly_detector)
-):
+async def detect_anomaly(request: AnomalyRequest):
     """
     Detect anomalies in performance/behavior metrics
 
     Returns anomaly detection with severity and recommendations
     """
     try:
-        result = detector.detect(request.metrics, request.entity_type)
+        result = await executors.call('anomaly', 'detect', request.metrics, request.entity_type)
         return AnomalyResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ml/anomaly/detect/batch", response_model=List[AnomalyResponse])
+async def detect_anomaly_batch(request: AnomalyBatchRequest):
+    """
+    Detect anomalies for a whole population in one model pass
+
+    Accepts either a list of metrics records or a column-oriented payload
+    """
+    try:
+        metrics = request.columns if request.columns is not None else (request.records or [])
+        results = await executors.call('anomaly', 'detect_batch', metrics, request.entity_type)
+        return [AnomalyResponse(**r) for r in results]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/ml/benchmark/compare", response_model=BenchmarkResponse)
-def compare_to_benchmark(
-    request: BenchmarkRequest,
-    benchmarker: PerformanceBenchmarker = Depends(get_performance_benchmarker)
-):
+async def compare_to_benchmark(request: BenchmarkRequest):
     """
     Compare user performance to benchmark
 
-    Returns percentile rank, performance level, and insights
+    Returns percentile rank, performance level, and insights. Falls back
+    to broader segments when the requested one has no benchmark, and
+    reports the level used in benchmark_level.
     """
     try:
-        result = benchmarker.compare_to_benchmark(
+        result = await executors.call(
+            'benchmark',
+            'compare_to_benchmark',
             request.user_value,
             request.metric_name,
             request.segment_by
@@ -267,14 +690,52 @@ def get_models_status():
         "productivity_predictor": _productivity_predictor is not None,
         "engagement_scorer": _engagement_scorer is not None,
         "anomaly_detector": _anomaly_detector is not None,
-        "performance_benchmarker": _performance_benchmarker is not None
+        "performance_benchmarker": _performance_benchmarker is not None,
+        "sentiment_cache": _sentiment_analyzer.cache_stats() if _sentiment_analyzer is not None else None,
+        "anomaly_neighbor_index": _anomaly_detector.neighbor_report if _anomaly_detector is not None else None,
+        "executors": executors.config()
     }
 
+@app.on_event("shutdown")
+def shutdown_executors():
+    executors.shutdown()
+
 if __name__ == "__main__":
     port = int(os.getenv("ML_SERVICE_PORT", 8001))
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=True
-    )
+    workers = int(os.getenv("ML_SERVICE_WORKERS", 1))
+
+    if workers > 1:
+        # Production: load models once and fork workers sharing them
+        from api.launcher import serve_prefork
+
+        # Split the cores between worker processes unless pinned explicitly
+        if not os.getenv("ML_INTRA_OP_THREADS"):
+            executors.set_intra_op_threads(max(1, executors.intra_op_threads // workers))
+
+        # Process pool families load their models in the pool workers, and
+        # ONNX Runtime sessions start their thread pools when created, so
+        # neither is loaded before forking
+        skip = set(executors.process_families)
+        if os.getenv("SENTIMENT_BACKEND", "torch") != "torch":
+            skip.add('sentiment')
+
+        preload = [
+            name.strip()
+            for name in os.getenv("ML_PRELOAD_MODELS", ",".join(MODEL_FACTORIES)).split(",")
+            if name.strip() and name.strip() not in skip
+        ]
+        serve_prefork(
+            app,
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            preload=[MODEL_FACTORIES[name] for name in preload],
+            intra_op_threads=executors.intra_op_threads
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            reload=os.getenv("ML_SERVICE_RELOAD", "true").lower() == "true"
+        )
@@ -5,43 +5,104 @@ Pattern recognition for burnout, disengagement, and performance decline
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple, Union
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from pyod.models.lof import LOF
 from pyod.models.knn import KNN
 import joblib
 
+from models.feature_schema import Feature, FeatureSchema
+from models.neighbor_index import NeighborIndex, NeighborScorer, UnsupportedMetricError
+from models.tree_engine import CompiledTreeEnsemble
+
 class AnomalyDetector:
     """
     Multi-method anomaly detection for employee performance and wellbeing
     """
 
-    def __init__(self, method: str = "isolation_forest", contamination: float = 0.1):
+    FEATURE_SCHEMA = FeatureSchema([
+        Feature('productivity_score', default=50),
+        Feature('engagement_score', default=50),
+        Feature('sentiment_score'),
+        Feature('hours_worked', default=40),
+        Feature('tasks_completed'),
+        Feature('meeting_hours'),
+        Feature('response_time', default=4, source='avg_response_time_hours'),
+        Feature('collaboration_score', default=50),
+        Feature('code_quality', default=70, source='code_quality_score'),
+        Feature('bug_rate')
+    ])
+
+    # Extra metrics read by the anomaly type rules
+    CONTEXT_SCHEMA = FeatureSchema([
+        Feature('meeting_attendance_rate', default=1.0),
+        Feature('productivity_trend_30d'),
+        Feature('communication_frequency'),
+        Feature('sentiment_trend_30d')
+    ])
+
+    ANOMALY_TYPES = (
+        "BURNOUT",
+        "DISENGAGEMENT",
+        "PERFORMANCE_DECLINE",
+        "OVERWORK",
+        "QUALITY_DECLINE",
+        "SOCIAL_WITHDRAWAL",
+        "NEGATIVE_SENTIMENT_SPIKE"
+    )
+
+    def __init__(
+        self,
+        method: str = "isolation_forest",
+        contamination: float = 0.1,
+        use_compiled_engine: bool = False,
+        neighbor_index: str = None
+    ):
         """
         Initialize anomaly detector
 
         Args:
             method: Detection method (isolation_forest, lof, knn)
             contamination: Expected proportion of anomalies
+            use_compiled_engine: Score isolation forests with a compiled
+                array-backed copy of the fitted trees
+            neighbor_index: Score lof/knn through a neighbor index
+                (exact or approximate) instead of pyod's search
+
+        Raises:
+            ValueError: If neighbor_index is not a known mode
         """
+        if neighbor_index and neighbor_index not in NeighborIndex.MODES:
+            raise ValueError(f"Unknown neighbor index mode: {neighbor_index}")
+
         self.method = method
         self.contamination = contamination
+        self.use_compiled_engine = use_compiled_engine
+        self.neighbor_index = neighbor_index
         self.scaler = StandardScaler()
-        self.model = None
+        # Initialize detector based on method
+        self.model = self._build_model()
+        self.engine = None
+        self.neighbor_scorer = None
+        self.neighbor_report = None
         self.baseline_stats = {}
+        self.feature_names = list(self.FEATURE_SCHEMA.names)
+        self._column_order = None
 
-        # Initialize detector based on method
-        if method == "isolation_forest":
-            self.model = IsolationForest(
-                contamination=contamination,
+    def _build_model(self):
+        """Create an unfitted detector for the configured method"""
+        if self.method == "isolation_forest":
+            return IsolationForest(
+                contamination=self.contamination,
                 random_state=42,
                 n_estimators=100
             )
-        elif method == "lof":
-            self.model = LOF(contamination=contamination)
-        elif method == "knn":
-            self.model = KNN(contamination=contamination)
+        elif self.method == "lof":
+            return LOF(contamination=self.contamination)
+        elif self.method == "knn":
+            return KNN(contamination=self.contamination)
+        return None
 
     def fit(self, historical_data: pd.DataFrame):
         """
@@ -50,15 +111,32 @@ class AnomalyDetector:
         Args:
             historical_data: DataFrame with historical metrics
         """
-        # Scale features
-        X_scaled = self.scaler.fit_transform(historical_data)
-
-        # Fit model
+        # Columns must match the serving schema; their order is kept and
+        # applied to every feature matrix built at detection time
+        self._column_order = self.FEATURE_SCHEMA.column_order(historical_data.columns)
+        self.feature_names = historical_data.columns.tolist()
+
+        # Scale features (as a plain array, since serving matrices carry
+        # their column order in feature_names rather than pandas labels)
+        X_scaled = self.scaler.fit_transform(historical_data.to_numpy())
+
+        # Fit model (a fresh one if load_model released it for an engine)
+        if self.model is None:
+            self.model = self._build_model()
         if self.method == "isolation_forest":
             self.model.fit(X_scaled)
         else:
             self.model.fit(X_scaled)
 
+        self.engine = None
+        if self.use_compiled_engine and self.method == "isolation_forest":
+            self.compile_engine(X_scaled)
+
+        self.neighbor_scorer = None
+        self.neighbor_report = None
+        if self.neighbor_index and self.method in ("lof", "knn"):
+            self.build_neighbor_index(X_scaled)
+
         # Store baseline statistics
         self.baseline_stats = {
             'mean': historical_data.mean().to_dict(),
@@ -80,18 +158,17 @@ class AnomalyDetector:
         """
         # Extract features
         features = self._extract_features(metrics)
-        X = np.array(list(features.values())).reshape(1, -1)
+        X = np.array([list(features.values())])
+        if self._column_order is not None:
+            X = X[:, self._column_order]
 
         # Scale features
         X_scaled = self.scaler.transform(X)
 
-        # Detect anomaly
-        if self.method == "isolation_forest":
-            anomaly_score = -self.model.score_samples(X_scaled)[0]  # Higher = more anomalous
-            is_anomaly = self.model.predict(X_scaled)[0] == -1
-        else:
-            is_anomaly = self.model.predict(X_scaled)[0] == 1
-            anomaly_score = self.model.decision_function(X_scaled)[0]
+        # Detect anomaly (one model pass; labels derive from the scores)
+        anomaly_scores, labels = self._score_batch(X_scaled)
+        anomaly_score = float(anomaly_scores[0])  # Higher = more anomalous
+        is_anomaly = labels[0]
 
         # Normalize anomaly score to 0-100
         normalized_score = min(max(anomaly_score * 50 + 50, 0), 100)
@@ -130,20 +207,172 @@ class AnomalyDetector:
             'suggested_actions': self._suggest_actions(anomaly_types, severity)
         }
 
+    def detect_batch(
+        self,
+        metrics: Union[List[Dict], Dict[str, Sequence]],
+        entity_type: str = "USER"
+    ) -> List[Dict]:
+        """
+        Detect anomalies for many entities at once
+
+        Scales the whole population and scores it in one model pass; for
+        isolation forests the anomaly label is derived from the same scores
+        via the fitted offset. Type rules, severity and z-score deviations
+        are computed as array operations. Results equal detect per entity.
+
+        Args:
+            metrics: List of metric dictionaries, or column-oriented metrics
+            entity_type: USER or TEAM
+
+        Returns:
+            List of anomaly detection results, in input order
+        """
+        F = self.FEATURE_SCHEMA.build(metrics)
+        if len(F) == 0:
+            return []
+
+        X = F[:, self._column_order] if self._column_order is not None else F
+        X_scaled = self.scaler.transform(X)
+
+        anomaly_scores, is_anomaly = self._score_batch(X_scaled)
+        normalized = np.clip(anomaly_scores * 50 + 50, 0, 100)
+        confidence = np.minimum(np.abs(anomaly_scores) / 2, 1.0)
+
+        type_masks = self._classify_anomaly_types(F, self.CONTEXT_SCHEMA.build(metrics))
+        burnout = type_masks[:, 0]
+
+        level = np.select(
+            [normalized > 80, normalized > 60, normalized > 40],
+            ["CRITICAL", "HIGH", "MEDIUM"],
+            "LOW"
+        )
+        # Burnout is the only critical type the rules produce
+        severity = np.where(burnout, "CRITICAL", level)
+        urgency = np.select(
+            [severity == "CRITICAL", severity == "HIGH"],
+            ["IMMEDIATE", "SOON"],
+            "MONITOR"
+        )
+
+        deviations = self._calculate_deviations_batch(F)
+        names = self.FEATURE_SCHEMA.names
+        recommendation_cache = {}
+
+        results = []
+        for i, row in enumerate(F.tolist()):
+            features = dict(zip(names, row))
+            anomaly_types = [t for t, flagged in zip(self.ANOMALY_TYPES, type_masks[i]) if flagged]
+            anomaly_types = anomaly_types or ["GENERAL_ANOMALY"]
+            factors = self._identify_contributing_factors(features, deviations[i])
+
+            key = (tuple(anomaly_types), tuple(factors))
+            if key not in recommendation_cache:
+                recommendation_cache[key] = self._generate_recommendations(anomaly_types, factors)
+
+            results.append({
+                'is_anomaly': bool(is_anomaly[i]),
+                'anomaly_score': round(float(normalized[i]), 2),
+                'confidence_score': round(float(confidence[i]), 2),
+                'anomaly_types': anomaly_types,
+                'severity': str(severity[i]),
+                'detection_method': self.method,
+                'current_metrics': features,
+                'deviations': deviations[i],
+                'contributing_factors': factors,
+                'risk_level': str(severity[i]),
+                'urgency': str(urgency[i]),
+                'recommendations': list(recommendation_cache[key]),
+                'suggested_actions': self._suggest_actions(anomaly_types, str(severity[i]))
+            })
+
+        return results
+
+    def _score_batch(self, X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score scaled rows with a single model pass
+
+        Labels are derived from the raw scores with the same rule the
+        model's own predict applies, so it is never evaluated twice.
+
+        Returns:
+            (anomaly scores, higher is more anomalous; anomaly labels)
+        """
+        if self.method == "isolation_forest":
+            if self.engine is not None:
+                raw = self.engine.score_samples(X_scaled)
+                offset = self.engine.params['offset']
+            else:
+                raw = self.model.score_samples(X_scaled)
+                offset = self.model.offset_
+            # IsolationForest.predict: decision_function = score - offset_ < 0
+            return -raw, raw - offset < 0
+
+        # pyod detectors: predict = decision_function > threshold_
+        scorer = self.neighbor_scorer if self.neighbor_scorer is not None else self.model
+        scores = scorer.decision_function(X_scaled)
+        return scores, scores > self.model.threshold_
+
+    def _classify_anomaly_types(self, F: np.ndarray, context: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the anomaly type rules for a feature matrix
+
+        Returns:
+            Boolean array of shape (n_rows, len(ANOMALY_TYPES))
+        """
+        f = dict(zip(self.FEATURE_SCHEMA.names, F.T))
+        c = dict(zip(self.CONTEXT_SCHEMA.names, context.T))
+
+        return np.column_stack([
+            (f['hours_worked'] > 55) & (f['productivity_score'] < 40) & (f['sentiment_score'] < -0.3),
+            (f['engagement_score'] < 30) & (f['response_time'] > 24) & (c['meeting_attendance_rate'] < 0.5),
+            (f['productivity_score'] < 40) & (c['productivity_trend_30d'] < -10),
+            (f['hours_worked'] > 60) | (f['meeting_hours'] > 30),
+            (f['bug_rate'] > 0.15) | (f['code_quality'] < 50),
+            (f['collaboration_score'] < 30) & (c['communication_frequency'] < 10),
+            (f['sentiment_score'] < -0.5) | (c['sentiment_trend_30d'] < -0.3)
+        ])
+
+    def _calculate_deviations_batch(self, F: np.ndarray) -> List[Dict]:
+        """
+        Calculate deviations from baseline for every row of a feature matrix
+
+        Returns:
+            Per-row deviation dictionaries, as _calculate_deviations
+        """
+        names = [
+            name for name in self.FEATURE_SCHEMA.names
+            if name in self.baseline_stats['mean'] and self.baseline_stats['std'][name] > 0
+        ]
+        if not names:
+            return [{} for _ in range(len(F))]
+
+        index = [self.FEATURE_SCHEMA.names.index(name) for name in names]
+        expected = np.array([self.baseline_stats['mean'][name] for name in names])
+        std = np.array([self.baseline_stats['std'][name] for name in names])
+
+        current = F[:, index]
+        z_scores = (current - expected) / std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(expected != 0, (current - expected) / expected * 100, 0)
+
+        expected_rounded = [round(value, 2) for value in expected.tolist()]
+        deviations = []
+        for current_row, z_row, pct_row in zip(current.tolist(), z_scores.tolist(), pct.tolist()):
+            deviations.append({
+                name: {
+                    'current': round(value, 2),
+                    'expected': expected_value,
+                    'deviation': round(z, 2),
+                    'deviation_percentage': round(p, 2)
+                }
+                for name, value, expected_value, z, p in zip(names, current_row, expected_rounded, z_row, pct_row)
+            })
+        return deviations
+
     def _extract_features(self, metrics: Dict) -> Dict:
-        """Extract relevant features for anomaly detection"""
-        return {
-            'productivity_score': metrics.get('productivity_score', 50),
-            'engagement_score': metrics.get('engagement_score', 50),
-            'sentiment_score': metrics.get('sentiment_score', 0),
-            'hours_worked': metrics.get('hours_worked', 40),
-            'tasks_completed': metrics.get('tasks_completed', 0),
-            'meeting_hours': metrics.get('meeting_hours', 0),
-            'response_time': metrics.get('avg_response_time_hours', 4),
-            'collaboration_score': metrics.get('collaboration_score', 50),
-            'code_quality': metrics.get('code_quality_score', 70),
-            'bug_rate': metrics.get('bug_rate', 0)
-        }
+        """Extract relevant features for anomaly detection, in schema order"""
+        X = self.FEATURE_SCHEMA.build([metrics])
+        return dict(zip(self.FEATURE_SCHEMA.names, X[0].tolist()))
 
     def _classify_anomaly_type(self, metrics: Dict, features: Dict) -> List[str]:
         """
@@ -365,19 +594,113 @@ class AnomalyDetector:
         else:
             return "MONITOR"
 
+    def compile_engine(self, validation_data: np.ndarray = None):
+        """
+        Compile the fitted isolation forest into flat node tables
+
+        Args:
+            validation_data: Scaled feature rows to validate on (defaults
+                to a synthetic probe in scaled feature space)
+
+        Raises:
+            ValueError: If the model is not a fitted isolation forest or
+                compiled scores disagree with sklearn
+        """
+        if self.method != "isolation_forest" or not hasattr(self.model, 'estimators_'):
+            raise ValueError("Only a fitted isolation forest can be compiled")
+
+        if validation_data is None:
+            rng = np.random.default_rng(42)
+            validation_data = rng.standard_normal((256, self.model.n_features_in_))
+
+        engine = CompiledTreeEnsemble.from_sklearn(self.model)
+        engine.validate(self.model, validation_data)
+        self.engine = engine
+
+    def build_neighbor_index(self, X_scaled: np.ndarray = None, report_size: int = 500):
+        """
+        Build index-backed scoring for a fitted lof/knn detector
+
+        Records a report of neighbor recall and label agreement against
+        the detector's exact search in neighbor_report. Detectors whose
+        distance metric the index can't reproduce keep their own scoring,
+        and the report says why.
+
+        Args:
+            X_scaled: Scaled training rows (read from the detector if omitted)
+            report_size: Training rows sampled for the accuracy report
+        """
+        if self.method not in ("lof", "knn") or not hasattr(self.model, 'threshold_'):
+            raise ValueError("Only a fitted lof or knn detector can use a neighbor index")
+
+        try:
+            scorer = NeighborScorer.from_pyod(self.model, X_scaled, mode=self.neighbor_index or "exact")
+        except UnsupportedMetricError as e:
+            # Keep the detector's own scoring rather than serve neighbors
+            # under a different distance
+            self.neighbor_scorer = None
+            self.neighbor_report = {'mode': self.neighbor_index, 'fallback': str(e)}
+            return
+
+        sample = scorer.index.data
+        if len(sample) > report_size:
+            rng = np.random.default_rng(42)
+            sample = sample[rng.choice(len(sample), report_size, replace=False)]
+
+        self.neighbor_report = scorer.report(sample, self.model)
+        self.neighbor_scorer = scorer
+
     def save_model(self, filepath: str):
         """Save detector to disk"""
         joblib.dump({
             'model': self.model,
             'scaler': self.scaler,
             'baseline_stats': self.baseline_stats,
-            'method': self.method
+            'method': self.method,
+            'feature_names': self.feature_names,
+            'engine': self.engine.to_dict() if self.engine is not None else None,
+            'neighbor_scorer': self.neighbor_scorer,
+            'neighbor_report': self.neighbor_report
         }, filepath)
 
-    def load_model(self, filepath: str):
-        """Load detector from disk"""
-        data = joblib.load(filepath)
+    def load_model(self, filepath: str, mmap_mode: str = None):
+        """
+        Load detector from disk
+
+        With use_compiled_engine an isolation forest's sklearn estimator is
+        released once the engine is ready, so only the compact node tables
+        stay resident.
+
+        Args:
+            filepath: Path written by save_model
+            mmap_mode: joblib memory-map mode (e.g. "r") so worker processes
+                share one physical copy of the stored arrays
+        """
+        data = joblib.load(filepath, mmap_mode=mmap_mode)
         self.model = data['model']
         self.scaler = data['scaler']
         self.baseline_stats = data['baseline_stats']
         self.method = data['method']
+
+        # Older files predate feature_names; baseline statistics were
+        # recorded in training column order
+        self.feature_names = data.get('feature_names') or list(self.baseline_stats['mean'])
+        self._column_order = self.FEATURE_SCHEMA.column_order(self.feature_names)
+
+        self.engine = None
+        if self.method == "isolation_forest" and (self.use_compiled_engine or self.model is None):
+            if data.get('engine') is not None:
+                self.engine = CompiledTreeEnsemble.from_dict(data['engine'])
+            else:
+                self.compile_engine()
+            self.model = None
+
+        self.neighbor_scorer = None
+        self.neighbor_report = None
+        if self.neighbor_index and self.method in ("lof", "knn"):
+            stored = data.get('neighbor_scorer')
+            if stored is not None and stored.index.mode == self.neighbor_index:
+                self.neighbor_scorer = stored
+                self.neighbor_report = data.get('neighbor_report')
+            else:
+                self.build_neighbor_index()
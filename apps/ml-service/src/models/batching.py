@@ -0,0 +1,55 @@
+"""
+Dynamic Batch Scheduling
+Length-bucketed batch planning for transformer inference
+"""
+
+from typing import List, Sequence
+
+
+def plan_token_batches(
+    lengths: Sequence[int],
+    max_batch_tokens: int = 8192,
+    max_batch_size: int = 64
+) -> List[List[int]]:
+    """
+    Group items into batches of similar length under a token budget
+
+    Items are sorted by length so each batch pads to a length close to
+    that of its members. A batch is closed when adding the next item would
+    push its padded size (batch size x longest item) over max_batch_tokens
+    or its item count over max_batch_size. A single item longer than the
+    budget still gets a batch of its own.
+
+    Args:
+        lengths: Token length of each item
+        max_batch_tokens: Maximum padded tokens per batch
+        max_batch_size: Maximum number of items per batch
+
+    Returns:
+        List of batches, each a list of indices into lengths
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    batches = []
+    current = []
+    current_max = 0
+
+    for idx in order:
+        length = max(int(lengths[idx]), 1)
+        padded_max = max(current_max, length)
+
+        if current and (
+            len(current) >= max_batch_size or
+            padded_max * (len(current) + 1) > max_batch_tokens
+        ):
+            batches.append(current)
+            current = []
+            padded_max = length
+
+        current.append(idx)
+        current_max = padded_max
+
+    if current:
+        batches.append(current)
+
+    return batches
@@ -0,0 +1,130 @@
+"""
+Benchmark Statistics
+Mergeable running statistics behind a performance benchmark
+"""
+
+import numpy as np
+from typing import Dict, Iterable, Union
+
+from models.quantile_sketch import QuantileSketch
+
+
+class BenchmarkStats:
+    """
+    Running count, mean, variance, extremes and quantile sketch of a metric
+
+    Batches are folded in with Welford's update, generalised to whole
+    batches (Chan et al.), so statistics built from daily deltas or from
+    separate shards merge into exactly the mean and variance of the combined
+    data; quantiles come from a mergeable QuantileSketch.
+    """
+
+    def __init__(self, sketch: QuantileSketch = None):
+        """
+        Initialize empty statistics
+
+        Args:
+            sketch: Quantile sketch to fill (a new one if None)
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = sketch if sketch is not None else QuantileSketch()
+
+    def update(self, values: Union[Iterable[float], np.ndarray]) -> "BenchmarkStats":
+        """Add values (NaN is ignored)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        batch_mean = float(np.mean(values))
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        self._combine(len(values), batch_mean, batch_m2, float(values.min()), float(values.max()))
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other: "BenchmarkStats") -> "BenchmarkStats":
+        """Fold another set of statistics into this one"""
+        if other.count == 0:
+            return self
+
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @classmethod
+    def from_summary(
+        cls,
+        count: int,
+        mean: float,
+        standard_deviation: float,
+        minimum: float,
+        maximum: float,
+        sketch: QuantileSketch
+    ) -> "BenchmarkStats":
+        """
+        Rebuild statistics from summary values
+
+        Args:
+            count: Number of values
+            mean: Mean of the values
+            standard_deviation: Sample standard deviation (ddof=1)
+            minimum: Smallest value
+            maximum: Largest value
+            sketch: Quantile sketch of the values
+        """
+        stats = cls(sketch)
+        stats.count = count
+        stats.mean = mean
+        stats.m2 = standard_deviation ** 2 * max(count - 1, 0)
+        stats.min = minimum
+        stats.max = maximum
+        return stats
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_deviation(self) -> float:
+        """Sample standard deviation (ddof=1)"""
+        return float(np.sqrt(self.variance))
+
+    def copy(self) -> "BenchmarkStats":
+        """Independent copy"""
+        return BenchmarkStats.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        """Serialize to plain values"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min,
+            'max': self.max,
+            'sketch': self.sketch.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BenchmarkStats":
+        """Restore from to_dict output"""
+        stats = cls(QuantileSketch.from_dict(data['sketch']))
+        stats.count = data['count']
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        stats.min = data['min']
+        stats.max = data['max']
+        return stats
+
+    def _combine(self, count: int, mean: float, m2: float, minimum: float, maximum: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
@@ -3,22 +3,77 @@ Engagement Scoring Algorithm
 Real-time engagement calculation from activity patterns
 """
 
+import math
+import time
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Sequence, Union
 from datetime import datetime, timedelta
 
+from models.engagement_state import EngagementStateStore
+from models.feature_schema import Feature, FeatureSchema
+
 class EngagementScorer:
     """
     Calculate engagement scores based on activity patterns and behaviors
     """
 
-    def __init__(self, weights: Dict[str, float] = None):
+    # Numeric metrics read by the vectorized path, with the same defaults
+    # as the per-user scoring methods
+    METRIC_SCHEMA = FeatureSchema([
+        Feature('meetings_attended'),
+        Feature('total_meetings', default=1),
+        Feature('meeting_participation_rate', default=0.5),
+        Feature('forum_posts'),
+        Feature('events_attended'),
+        Feature('surveys_completed'),
+        Feature('total_surveys', default=1),
+        Feature('messages_sent'),
+        Feature('expected_messages_per_week', default=50),
+        Feature('responses_to_mentions'),
+        Feature('total_mentions', default=1),
+        Feature('communication_clarity', default=0.7),
+        Feature('reactions_given'),
+        Feature('code_reviews_given'),
+        Feature('pair_programming_sessions'),
+        Feature('knowledge_contributions'),
+        Feature('cross_team_collaborations'),
+        Feature('mentoring_sessions'),
+        Feature('self_initiated_tasks'),
+        Feature('improvements_suggested'),
+        Feature('voluntary_contributions'),
+        Feature('proactive_problem_solving'),
+        Feature('learning_activities'),
+        Feature('avg_response_time_hours', default=24),
+        Feature('response_rate', default=0.7),
+        Feature('availability_percentage', default=0.8),
+        Feature('acknowledgment_rate', default=0.6),
+        Feature('activity_variance'),
+        Feature('current_engagement_score', default=50),
+        Feature('previous_engagement_score', default=50),
+        Feature('week_ago_engagement_score', default=50),
+        Feature('engagement_trend'),
+        Feature('avg_daily_activities'),
+        Feature('consistency_score', default=50)
+    ])
+
+    RISK_FACTORS = (
+        "Overall engagement below threshold",
+        "Declining engagement trend",
+        "Very low participation in meetings and activities",
+        "Minimal communication with team",
+        "Lack of proactive behavior",
+        "Slow or no responses to communications"
+    )
+
+    def __init__(self, weights: Dict[str, float] = None, state_store: EngagementStateStore = None):
         """
         Initialize engagement scorer with component weights
 
         Args:
             weights: Dictionary of component weights (defaults to balanced)
+            state_store: Per-user rolling state for incremental scoring
         """
+        self.state_store = state_store
         self.weights = weights or {
             'participation': 0.25,
             'communication': 0.20,
@@ -95,6 +150,307 @@ class EngagementScorer:
             'risk_level': risk_level
         }
 
+    def update(self, user_id: str, events: List[Dict], timestamp: float = None) -> Dict:
+        """
+        Score a user incrementally from new activity events
+
+        Events are folded into the user's stored rolling window, and the
+        trend is computed against the user's stored score history instead
+        of caller-supplied previous scores.
+
+        Args:
+            user_id: User identifier
+            events: Activity deltas (count metrics) and current values
+                (rates, averages) since the last update
+            timestamp: Event time in epoch seconds (defaults to now)
+
+        Returns:
+            Engagement score breakdown as calculate_score, plus ewma_score
+        """
+        if self.state_store is None:
+            raise ValueError("Incremental scoring requires a state store")
+
+        timestamp = time.time() if timestamp is None else timestamp
+
+        store = self.state_store
+        with store.transaction(user_id) as state:
+            metrics = store.apply_events(state, events, timestamp)
+
+            components = {
+                'participation': self._score_participation(metrics),
+                'communication': self._score_communication(metrics),
+                'collaboration': self._score_collaboration(metrics),
+                'initiative': self._score_initiative(metrics),
+                'responsiveness': self._score_responsiveness(metrics)
+            }
+            current = sum(components[name] * self.weights[name] for name in components)
+
+            # Users without history start out stable
+            previous, week_ago = store.reference_scores(state, timestamp)
+            previous = current if previous is None else previous
+            week_ago = current if week_ago is None else week_ago
+
+            metrics['current_engagement_score'] = current
+            metrics['previous_engagement_score'] = previous
+            metrics['week_ago_engagement_score'] = week_ago
+            metrics['engagement_trend'] = current - week_ago
+
+            result = self.calculate_score(metrics)
+            result['ewma_score'] = round(store.record_score(state, timestamp, current, components), 2)
+
+        return result
+
+    def calculate_scores(
+        self,
+        metrics: Union[List[Dict], Dict[str, Sequence]]
+    ) -> List[Dict]:
+        """
+        Calculate engagement scores for many users at once
+
+        Component scores, levels, trend and risk are computed with array
+        operations over all users; results equal calculate_score for each
+        user. Missing or null metrics take the same defaults.
+
+        Args:
+            metrics: List of metric dictionaries, or column-oriented metrics
+                (dict of sequences or DataFrame), one row per user
+
+        Returns:
+            List of engagement score breakdowns, in input order
+        """
+        scores = self._score_arrays(metrics)
+        n = len(scores['overall_score'])
+        if n == 0:
+            return []
+
+        hourly = self._object_column(metrics, 'hourly_activity_distribution', n)
+        daily = self._object_column(metrics, 'daily_activity_distribution', n)
+        passthrough = {
+            name: self._object_column(metrics, name, n, default)
+            for name, default in (
+                ('synchronous_engagement_pct', 0),
+                ('asynchronous_engagement_pct', 0),
+                ('total_activities', 0),
+                ('active_days', 0)
+            )
+        }
+
+        # Convert once so every value below is a Python float/bool/str
+        columns = {name: values.tolist() for name, values in scores.items()}
+        risk_factors = self._risk_factor_lists(scores['risk_masks'])
+
+        results = []
+        for i in range(n):
+            patterns = {}
+            if isinstance(hourly[i], dict) and hourly[i]:
+                patterns['peak_activity_hour'] = max(hourly[i].items(), key=lambda x: x[1])[0]
+            if isinstance(daily[i], dict) and daily[i]:
+                patterns['most_active_day'] = max(daily[i].items(), key=lambda x: x[1])[0]
+            patterns['consistency_score'] = round(columns['consistency'][i], 2)
+            patterns['engagement_distribution'] = {
+                'synchronous': passthrough['synchronous_engagement_pct'][i],
+                'asynchronous': passthrough['asynchronous_engagement_pct'][i]
+            }
+
+            results.append({
+                'overall_score': round(columns['overall_score'][i], 2),
+                'score_level': columns['score_level'][i],
+                'component_scores': {
+                    component: round(columns[component][i], 2)
+                    for component in self.weights
+                },
+                'activity_metrics': {
+                    'total_activities': passthrough['total_activities'][i],
+                    'active_days': passthrough['active_days'][i],
+                    'avg_daily_activities': round(columns['avg_daily_activities'][i], 1),
+                    'consistency_score': round(columns['consistency_score'][i], 1)
+                },
+                'engagement_patterns': patterns,
+                'trend_direction': columns['trend_direction'][i],
+                'change_from_previous': round(columns['change'][i], 2),
+                'week_over_week_change': round(columns['wow_change'][i], 2),
+                'risk_factors': risk_factors[i],
+                'at_risk': columns['at_risk'][i],
+                'risk_level': columns['risk_level'][i]
+            })
+
+        return results
+
+    def calculate_score_columns(
+        self,
+        metrics: Union[List[Dict], Dict[str, Sequence]]
+    ) -> Dict[str, object]:
+        """
+        Calculate engagement scores for many users, returned column-oriented
+
+        Same values as calculate_scores without the per-user nested
+        dictionaries; activity metrics and engagement patterns are omitted.
+
+        Args:
+            metrics: List of metric dictionaries, or column-oriented metrics
+
+        Returns:
+            Mapping of result field -> list of values (component_scores is a
+            mapping of component -> list of values)
+        """
+        scores = self._score_arrays(metrics)
+
+        def rounded(values: np.ndarray) -> List[float]:
+            return [round(value, 2) for value in values.tolist()]
+
+        return {
+            'overall_score': rounded(scores['overall_score']),
+            'score_level': scores['score_level'].tolist(),
+            'component_scores': {
+                component: rounded(scores[component])
+                for component in self.weights
+            },
+            'trend_direction': scores['trend_direction'].tolist(),
+            'change_from_previous': rounded(scores['change']),
+            'week_over_week_change': rounded(scores['wow_change']),
+            'risk_factors': self._risk_factor_lists(scores['risk_masks']),
+            'at_risk': scores['at_risk'].tolist(),
+            'risk_level': scores['risk_level'].tolist()
+        }
+
+    def _risk_factor_lists(self, risk_masks: np.ndarray) -> List[List[str]]:
+        """Turn a (factor, user) flag matrix into each user's risk factor list"""
+        return [
+            [factor for factor, flagged in zip(self.RISK_FACTORS, flags) if flagged]
+            for flags in risk_masks.T.tolist()
+        ]
+
+    def _score_arrays(self, metrics: Union[List[Dict], Dict[str, Sequence]]) -> Dict[str, np.ndarray]:
+        """
+        Compute unrounded score arrays for a population
+
+        Operations mirror the per-user scoring methods term by term, in the
+        same order, so float results are identical.
+        """
+        X = self.METRIC_SCHEMA.build(metrics)
+        m = dict(zip(self.METRIC_SCHEMA.names, X.T))
+
+        # Participation
+        participation = 0.0
+        participation = participation + np.minimum(m['meetings_attended'] / np.maximum(m['total_meetings'], 1), 1.0) * 30
+        participation = participation + m['meeting_participation_rate'] * 25
+        participation = participation + np.minimum(m['forum_posts'] / 10, 1.0) * 20
+        participation = participation + np.minimum(m['events_attended'] / 5, 1.0) * 15
+        participation = participation + np.minimum(m['surveys_completed'] / np.maximum(m['total_surveys'], 1), 1.0) * 10
+        participation = np.minimum(participation, 100.0)
+
+        # Communication
+        with np.errstate(divide='ignore', invalid='ignore'):
+            message_rate = np.minimum(m['messages_sent'] / m['expected_messages_per_week'], 1.5)
+        communication = 0.0
+        communication = communication + np.minimum(message_rate * 30, 40)
+        communication = communication + np.minimum(m['responses_to_mentions'] / np.maximum(m['total_mentions'], 1), 1.0) * 25
+        communication = communication + m['communication_clarity'] * 20
+        communication = communication + np.minimum(m['reactions_given'] / 20, 1.0) * 15
+        communication = np.minimum(communication, 100.0)
+
+        # Collaboration
+        collaboration = 0.0
+        collaboration = collaboration + np.minimum(m['code_reviews_given'] / 10, 1.0) * 25
+        collaboration = collaboration + np.minimum(m['pair_programming_sessions'] / 5, 1.0) * 20
+        collaboration = collaboration + np.minimum(m['knowledge_contributions'] / 3, 1.0) * 20
+        collaboration = collaboration + np.minimum(m['cross_team_collaborations'] / 5, 1.0) * 20
+        collaboration = collaboration + np.minimum(m['mentoring_sessions'] / 3, 1.0) * 15
+        collaboration = np.minimum(collaboration, 100.0)
+
+        # Initiative
+        initiative = 0.0
+        initiative = initiative + np.minimum(m['self_initiated_tasks'] / 3, 1.0) * 30
+        initiative = initiative + np.minimum(m['improvements_suggested'] / 2, 1.0) * 25
+        initiative = initiative + np.minimum(m['voluntary_contributions'] / 3, 1.0) * 20
+        initiative = initiative + np.minimum(m['proactive_problem_solving'] / 3, 1.0) * 15
+        initiative = initiative + np.minimum(m['learning_activities'] / 2, 1.0) * 10
+        initiative = np.minimum(initiative, 100.0)
+
+        # Responsiveness
+        response_time = m['avg_response_time_hours']
+        responsiveness = 0.0 + np.select(
+            [response_time <= 2, response_time <= 8, response_time <= 24],
+            [40.0, 30.0, 20.0],
+            10.0
+        )
+        responsiveness = responsiveness + m['response_rate'] * 30
+        responsiveness = responsiveness + m['availability_percentage'] * 20
+        responsiveness = responsiveness + m['acknowledgment_rate'] * 10
+        responsiveness = np.minimum(responsiveness, 100.0)
+
+        components = {
+            'participation': participation,
+            'communication': communication,
+            'collaboration': collaboration,
+            'initiative': initiative,
+            'responsiveness': responsiveness
+        }
+
+        overall = (
+            participation * self.weights['participation'] +
+            communication * self.weights['communication'] +
+            collaboration * self.weights['collaboration'] +
+            initiative * self.weights['initiative'] +
+            responsiveness * self.weights['responsiveness']
+        )
+
+        score_level = np.select(
+            [overall >= 80, overall >= 65, overall >= 45, overall >= 30],
+            ["VERY_HIGH", "HIGH", "MODERATE", "LOW"],
+            "VERY_LOW"
+        )
+
+        # Trend
+        change = m['current_engagement_score'] - m['previous_engagement_score']
+        wow_change = m['current_engagement_score'] - m['week_ago_engagement_score']
+        trend_direction = np.select([change > 5, change < -5], ["IMPROVING", "DECLINING"], "STABLE")
+
+        # Risk, in RISK_FACTORS order
+        risk_masks = np.array([
+            overall < 40,
+            m['engagement_trend'] < -10,
+            participation < 30,
+            communication < 30,
+            initiative < 20,
+            responsiveness < 30
+        ]).reshape(len(self.RISK_FACTORS), len(overall))
+        risk_score = np.array([30, 20, 15, 15, 10, 10]) @ risk_masks
+        risk_level = np.select(
+            [risk_score >= 50, risk_score >= 30, risk_score >= 15],
+            ["CRITICAL", "HIGH", "MEDIUM"],
+            "LOW"
+        )
+
+        return {
+            **components,
+            'overall_score': overall,
+            'score_level': score_level,
+            'consistency': 100 - np.minimum(m['activity_variance'], 100),
+            'change': change,
+            'wow_change': wow_change,
+            'trend_direction': trend_direction,
+            'risk_masks': risk_masks,
+            'at_risk': risk_score >= 15,
+            'risk_level': risk_level,
+            'avg_daily_activities': m['avg_daily_activities'],
+            'consistency_score': m['consistency_score']
+        }
+
+    def _object_column(self, metrics, name: str, n: int, default=None) -> List:
+        """Read a metric as raw Python values, with default for missing or null"""
+        if isinstance(metrics, list):
+            values = [record.get(name) for record in metrics]
+        elif name in metrics:
+            values = list(metrics[name])
+        else:
+            return [default] * n
+
+        return [
+            default if value is None or (isinstance(value, float) and math.isnan(value)) else value
+            for value in values
+        ]
+
     def _score_participation(self, metrics: Dict) -> float:
         """
         Score participation in meetings, discussions, and activities
@@ -0,0 +1,263 @@
+"""
+Engagement State Store
+Compact rolling per-user state for incremental engagement scoring
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SECONDS_PER_DAY = 86400
+
+
+class EngagementStateStore:
+    """
+    Rolling engagement state per user
+
+    Activity events are folded into daily buckets: count metrics are
+    summed over the trailing window, and every other metric (rates, averages,
+    percentages) keeps its latest reported value. Alongside the activity
+    window each user keeps their last N scores with timestamps, an EWMA of
+    the overall score and the latest component snapshot. State lives in
+    a bounded in-memory LRU, or in SQLite when db_path is set so it
+    survives restarts and is shared by worker processes.
+
+    Read-modify-write updates go through transaction(), which is atomic
+    across threads and, with SQLite, across processes.
+    """
+
+    COUNTER_METRICS = frozenset({
+        'meetings_attended',
+        'total_meetings',
+        'forum_posts',
+        'events_attended',
+        'surveys_completed',
+        'total_surveys',
+        'messages_sent',
+        'responses_to_mentions',
+        'total_mentions',
+        'reactions_given',
+        'code_reviews_given',
+        'pair_programming_sessions',
+        'knowledge_contributions',
+        'cross_team_collaborations',
+        'mentoring_sessions',
+        'self_initiated_tasks',
+        'improvements_suggested',
+        'voluntary_contributions',
+        'proactive_problem_solving',
+        'learning_activities',
+        'total_activities'
+    })
+
+    def __init__(
+        self,
+        window_days: int = 7,
+        history_size: int = 32,
+        ewma_alpha: float = 0.3,
+        db_path: Optional[str] = None,
+        max_users: int = 100000
+    ):
+        """
+        Initialize state store
+
+        Args:
+            window_days: Days of activity summed into count metrics
+            history_size: Number of past scores kept per user
+            ewma_alpha: Smoothing factor for the overall score EWMA
+            db_path: SQLite database file for persistence (in-memory only if None)
+            max_users: Users kept in memory without db_path; the least
+                recently updated are evicted beyond this
+        """
+        self.window_days = window_days
+        self.history_size = history_size
+        self.ewma_alpha = ewma_alpha
+        self.max_users = max_users
+        self.lock = threading.RLock()
+
+        self.db_path = db_path
+        self._states = OrderedDict()
+        self._db = None
+        self._db_pid = None
+
+    def get(self, user_id: str) -> Dict:
+        """
+        Get a user's state, or an empty one for a new user
+
+        Returns:
+            State dictionary with buckets, gauges, scores, ewma and components
+        """
+        with self.lock:
+            if self.db_path:
+                return self._load(self._connection(), user_id)
+            return self._states.get(user_id) or self._empty_state()
+
+    def save(self, user_id: str, state: Dict):
+        """Store a user's updated state"""
+        with self.lock:
+            if self.db_path:
+                self._store(self._connection(), user_id, state)
+            else:
+                self._put(user_id, state)
+
+    @contextmanager
+    def transaction(self, user_id: str) -> Iterator[Dict]:
+        """
+        Update a user's state atomically
+
+        Yields the current state; changes made to it are saved when the
+        block exits normally and discarded if it raises. With SQLite the
+        load and write run in one BEGIN IMMEDIATE transaction, so updates
+        from other worker processes wait instead of being overwritten.
+        """
+        with self.lock:
+            if not self.db_path:
+                state = copy.deepcopy(self._states.get(user_id)) or self._empty_state()
+                yield state
+                self._put(user_id, state)
+                return
+
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._load(db, user_id)
+                yield state
+                self._store(db, user_id, state)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def apply_events(self, state: Dict, events: List[Dict], timestamp: float) -> Dict:
+        """
+        Fold activity events into a user's state
+
+        Each event maps metric names to values; count metrics are deltas
+        added to the event's day, other metrics replace the current value.
+        An event may carry its own 'timestamp' (epoch seconds).
+
+        Returns:
+            Metrics for the current window, as calculate_score expects them
+        """
+        buckets = state['buckets']
+
+        for event in events:
+            event_time = float(event.get('timestamp', timestamp))
+            day = str(int(event_time // SECONDS_PER_DAY))
+            for name, value in event.items():
+                if name == 'timestamp' or value is None:
+                    continue
+                if name in self.COUNTER_METRICS:
+                    bucket = buckets.setdefault(day, {})
+                    bucket[name] = bucket.get(name, 0) + value
+                else:
+                    state['gauges'][name] = value
+
+        # Drop days that have left the window
+        oldest_day = int(timestamp // SECONDS_PER_DAY) - self.window_days + 1
+        for day in [day for day in buckets if int(day) < oldest_day]:
+            del buckets[day]
+
+        metrics = dict(state['gauges'])
+        for bucket in buckets.values():
+            for name, value in bucket.items():
+                metrics[name] = metrics.get(name, 0) + value
+        metrics['active_days'] = len(buckets)
+        return metrics
+
+    def reference_scores(self, state: Dict, timestamp: float) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Get the scores a new score is compared against
+
+        Returns:
+            (previous score, latest score from at least window_days ago or
+            the oldest one kept), None where there is no history
+        """
+        scores = state['scores']
+        if not scores:
+            return None, None
+
+        cutoff = timestamp - self.window_days * SECONDS_PER_DAY
+        week_ago = scores[0][1]
+        for scored_at, score in scores:
+            if scored_at > cutoff:
+                break
+            week_ago = score
+        return scores[-1][1], week_ago
+
+    def record_score(self, state: Dict, timestamp: float, score: float, components: Dict[str, float]) -> float:
+        """
+        Append a score to the user's history
+
+        Returns:
+            Updated EWMA of the overall score
+        """
+        state['scores'].append([timestamp, score])
+        del state['scores'][:-self.history_size]
+        state['components'] = components
+        if state['ewma'] is None:
+            state['ewma'] = score
+        else:
+            state['ewma'] = self.ewma_alpha * score + (1 - self.ewma_alpha) * state['ewma']
+        return state['ewma']
+
+    def reset(self, user_id: str):
+        """Forget a user's state"""
+        with self.lock:
+            self._states.pop(user_id, None)
+            if self.db_path:
+                self._connection().execute("DELETE FROM engagement_state WHERE user_id = ?", (user_id,))
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self.lock:
+            if self._db is not None and self._db_pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each process opens its own
+        if self._db is None or self._db_pid != os.getpid():
+            # Autocommit mode; transaction() issues its own BEGIN/COMMIT
+            self._db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._db_pid = os.getpid()
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS engagement_state ("
+                "user_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+        return self._db
+
+    def _load(self, db: sqlite3.Connection, user_id: str) -> Dict:
+        row = db.execute(
+            "SELECT state FROM engagement_state WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else self._empty_state()
+
+    def _store(self, db: sqlite3.Connection, user_id: str, state: Dict):
+        db.execute(
+            "INSERT INTO engagement_state (user_id, state, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+            (user_id, json.dumps(state), time.time())
+        )
+
+    def _put(self, user_id: str, state: Dict):
+        self._states[user_id] = state
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_users:
+            self._states.popitem(last=False)
+
+    def _empty_state(self) -> Dict:
+        return {
+            'buckets': {},
+            'gauges': {},
+            'scores': [],
+            'ewma': None,
+            'components': {}
+        }
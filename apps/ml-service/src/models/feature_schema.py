@@ -0,0 +1,171 @@
+"""
+Feature Schemas
+Declarative model inputs compiled to contiguous feature matrices
+"""
+
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+
+class Feature:
+    """
+    One model input column
+
+    The value is read from `source` (defaulting to the feature name), with
+    `default` standing in for missing or null values. Derived features set
+    `transform`, a vectorized function applied to the source column.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        default: float = 0.0,
+        source: Optional[str] = None,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ):
+        """
+        Initialize feature
+
+        Args:
+            name: Feature name as seen by the model
+            default: Value used when the source is missing or null
+            source: Input key or column to read (defaults to name)
+            transform: Vectorized function of the source column
+        """
+        self.name = name
+        self.default = default
+        self.source = source or name
+        self.transform = transform
+
+    def __repr__(self) -> str:
+        return f"Feature({self.name!r}, default={self.default!r}, source={self.source!r})"
+
+
+class FeatureSchema:
+    """
+    Ordered set of features for one model
+
+    Builds the model's feature matrix column by column, from a list of
+    records or from columnar input (lists, NumPy/pandas/Arrow arrays), and
+    checks that the columns a model was trained on match the schema.
+    """
+
+    def __init__(self, features: Sequence[Feature], dtype=np.float64):
+        """
+        Initialize schema
+
+        Args:
+            features: Features in model column order
+            dtype: Output matrix dtype
+        """
+        self.features = list(features)
+        self.dtype = np.dtype(dtype)
+        self.names = [feature.name for feature in self.features]
+
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Feature names must be unique")
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def build(self, data: Union[Dict, List[Dict], Dict[str, Sequence]]) -> np.ndarray:
+        """
+        Build the feature matrix
+
+        Args:
+            data: A single record, a list of records, or a column-oriented
+                mapping (dict of sequences, DataFrame or Arrow table); an
+                empty mapping has no rows
+
+        Returns:
+            C-contiguous array of shape (n_rows, n_features)
+        """
+        if isinstance(data, list):
+            return self._build_from_records(data)
+
+        if isinstance(data, dict) and data and not any(_is_column(value) for value in data.values()):
+            return self._build_from_records([data])
+
+        return self._build_from_columns(data)
+
+    def column_order(self, feature_names: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        Map schema columns onto the column order a model was trained with
+
+        Args:
+            feature_names: Training column names, in training order
+
+        Returns:
+            Index array that reorders built matrices into training order,
+            or None if the orders already match
+
+        Raises:
+            ValueError: If the training columns differ from the schema
+        """
+        feature_names = list(feature_names)
+        missing = [name for name in self.names if name not in feature_names]
+        unexpected = [name for name in feature_names if name not in self.names]
+        if missing or unexpected or len(feature_names) != len(self.names):
+            raise ValueError(
+                f"Feature mismatch between training and serving: "
+                f"missing from training {missing}, not in schema {unexpected}"
+            )
+
+        if feature_names == self.names:
+            return None
+
+        position = {name: i for i, name in enumerate(self.names)}
+        return np.array([position[name] for name in feature_names])
+
+    def _build_from_records(self, records: List[Dict]) -> np.ndarray:
+        X = np.empty((len(records), len(self.features)), dtype=self.dtype)
+
+        for j, feature in enumerate(self.features):
+            # None converts to NaN, which is then defaulted like null columns
+            column = np.array([record.get(feature.source) for record in records], dtype=self.dtype)
+            column = np.where(np.isnan(column), feature.default, column)
+            X[:, j] = self._finish(feature, column)
+
+        return X
+
+    def _build_from_columns(self, data) -> np.ndarray:
+        columns = {}
+        for feature in self.features:
+            if feature.source not in columns:
+                column = _get_column(data, feature.source)
+                if column is not None:
+                    columns[feature.source] = np.asarray(column, dtype=self.dtype)
+
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All feature columns must have the same length")
+        n_rows = lengths.pop() if lengths else 0
+
+        X = np.empty((n_rows, len(self.features)), dtype=self.dtype)
+
+        for j, feature in enumerate(self.features):
+            column = columns.get(feature.source)
+            if column is None:
+                column = np.full(n_rows, feature.default, dtype=self.dtype)
+            else:
+                column = np.where(np.isnan(column), feature.default, column)
+            X[:, j] = self._finish(feature, column)
+
+        return X
+
+    def _finish(self, feature: Feature, column: np.ndarray) -> np.ndarray:
+        if feature.transform is not None:
+            column = feature.transform(column)
+        return column
+
+
+def _is_column(value) -> bool:
+    # NumPy scalars have ndim 0, Arrow arrays have no ndim but to_numpy
+    return isinstance(value, (list, tuple)) or getattr(value, 'ndim', 0) > 0 or hasattr(value, 'to_numpy')
+
+
+def _get_column(data, name: str):
+    # Arrow tables and record batches
+    if hasattr(data, 'column_names'):
+        return data.column(name) if name in data.column_names else None
+    return data[name] if name in data else None
@@ -0,0 +1,235 @@
+"""
+Transformer Inference Backends
+PyTorch and ONNX Runtime sequence classifiers behind a common interface
+"""
+
+import os
+import numpy as np
+from typing import Dict, List, Optional
+from transformers import AutoConfig, AutoModelForSequenceClassification
+import torch
+
+BACKENDS = ("torch", "onnx", "onnx_int8")
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
+    return shifted / np.sum(shifted, axis=-1, keepdims=True)
+
+
+class TorchSequenceClassifier:
+    """
+    Eager PyTorch sequence classifier
+    """
+
+    def __init__(self, model_name: str, device: str = "cpu"):
+        """
+        Load a HuggingFace sequence classification model
+
+        Args:
+            model_name: HuggingFace model name
+            device: Torch device to run on
+        """
+        self.model_name = model_name
+        self.device = device
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.to(device)
+        self.model.eval()
+        self.labels = self.model.config.id2label
+
+    def predict_proba(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Compute class probabilities for a padded batch
+
+        Args:
+            inputs: Tokenizer output (input_ids, attention_mask) as arrays
+
+        Returns:
+            Array of shape (batch, num_labels)
+        """
+        tensors = {key: torch.as_tensor(value).to(self.device) for key, value in inputs.items()}
+
+        with torch.no_grad():
+            logits = self.model(**tensors).logits
+            probs = torch.nn.functional.softmax(logits, dim=-1)
+
+        return probs.cpu().numpy()
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Export wrapper returning bare logits instead of a ModelOutput"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+class OnnxSequenceClassifier:
+    """
+    ONNX Runtime sequence classifier with on-disk export cache
+
+    The PyTorch model is exported once per model name (and quantized to
+    int8 when requested); later instances load the cached artifact without
+    materializing the PyTorch weights.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str,
+        quantize: bool = False,
+        num_threads: Optional[int] = None
+    ):
+        """
+        Load (exporting if needed) an ONNX sequence classifier
+
+        Args:
+            model_name: HuggingFace model name
+            cache_dir: Directory holding exported ONNX artifacts
+            quantize: Use dynamic int8 quantized weights
+            num_threads: Intra-op threads for the ONNX Runtime session
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime is required for the ONNX inference backend")
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.model_path = self._artifact_path(cache_dir, quantize)
+
+        if not os.path.exists(self.model_path):
+            self._export(cache_dir)
+
+        self.labels = AutoConfig.from_pretrained(model_name).id2label
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            self.model_path,
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def _artifact_path(self, cache_dir: str, quantize: bool) -> str:
+        model_dir = os.path.join(cache_dir, self.model_name.replace("/", "__"))
+        filename = "model.int8.onnx" if quantize else "model.onnx"
+        return os.path.join(model_dir, filename)
+
+    def _export(self, cache_dir: str):
+        """Export the PyTorch model to ONNX and optionally quantize it"""
+        fp32_path = self._artifact_path(cache_dir, quantize=False)
+        os.makedirs(os.path.dirname(fp32_path), exist_ok=True)
+
+        if not os.path.exists(fp32_path):
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.eval()
+
+            dummy_ids = torch.ones((1, 8), dtype=torch.long)
+            dummy_mask = torch.ones((1, 8), dtype=torch.long)
+
+            # Write to a temporary file first so concurrent workers never
+            # load a partially written artifact
+            tmp_path = f"{fp32_path}.{os.getpid()}.tmp"
+            torch.onnx.export(
+                _LogitsOnly(model),
+                (dummy_ids, dummy_mask),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"}
+                },
+                opset_version=14,
+                do_constant_folding=True
+            )
+            os.replace(tmp_path, fp32_path)
+
+        if self.quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            tmp_path = f"{self.model_path}.{os.getpid()}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, self.model_path)
+
+    def predict_proba(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Compute class probabilities for a padded batch
+
+        Args:
+            inputs: Tokenizer output (input_ids, attention_mask) as arrays
+
+        Returns:
+            Array of shape (batch, num_labels)
+        """
+        feed = {
+            name: np.asarray(inputs[name], dtype=np.int64)
+            for name in self.input_names
+        }
+        logits = self.session.run(["logits"], feed)[0]
+        return _softmax(logits)
+
+
+def load_sequence_classifier(
+    model_name: str,
+    backend: str = "torch",
+    device: str = "cpu",
+    cache_dir: Optional[str] = None,
+    num_threads: Optional[int] = None
+):
+    """
+    Create a sequence classifier for the requested backend
+
+    Args:
+        model_name: HuggingFace model name
+        backend: One of torch, onnx, onnx_int8
+        device: Torch device (torch backend only)
+        cache_dir: ONNX artifact directory (onnx backends only)
+        num_threads: Intra-op threads per session (onnx backends only;
+            torch follows torch.set_num_threads)
+
+    Returns:
+        Classifier exposing predict_proba(inputs) and labels
+    """
+    if backend == "torch":
+        return TorchSequenceClassifier(model_name, device=device)
+    elif backend in ("onnx", "onnx_int8"):
+        return OnnxSequenceClassifier(
+            model_name,
+            cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "pms-ml", "onnx"),
+            quantize=backend == "onnx_int8",
+            num_threads=num_threads
+        )
+
+    raise ValueError(f"Unknown inference backend: {backend}. Expected one of {BACKENDS}")
+
+
+def check_parity(tokenizer, reference, candidate, texts: List[str]) -> Dict:
+    """
+    Compare two classifiers for the same model on sample texts
+
+    Used to validate an exported backend against the PyTorch reference
+    before serving it.
+
+    Returns:
+        Maximum absolute probability difference and argmax label agreement
+    """
+    inputs = dict(tokenizer(texts, truncation=True, max_length=512, padding=True, return_tensors="np"))
+
+    expected = reference.predict_proba(inputs)
+    actual = candidate.predict_proba(inputs)
+
+    return {
+        'max_abs_diff': float(np.max(np.abs(expected - actual))),
+        'label_agreement': float(np.mean(expected.argmax(axis=-1) == actual.argmax(axis=-1))),
+        'samples': len(texts)
+    }
@@ -0,0 +1,320 @@
+"""
+Neighbor Index
+Index-backed neighbor search and scoring for LOF/KNN anomaly detection
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+from sklearn.neighbors import KDTree
+
+
+class UnsupportedMetricError(ValueError):
+    """Distance metric the neighbor index cannot reproduce"""
+
+
+class NeighborIndex:
+    """
+    Nearest-neighbor search over a fixed reference set
+
+    exact mode answers queries from a KD-tree over the full feature space,
+    under any of the KD-tree's Minkowski-family metrics. approximate mode
+    (euclidean only) builds the KD-tree over the leading principal
+    components, fetches oversample * k candidates there and re-ranks them
+    by exact distance, so query cost stays close to logarithmic in the
+    reference size even as the feature count grows.
+    """
+
+    MODES = ("exact", "approximate")
+    METRICS = ("euclidean", "manhattan", "chebyshev", "minkowski")
+
+    def __init__(
+        self,
+        mode: str = "exact",
+        leaf_size: int = 40,
+        projection_dims: Optional[int] = None,
+        oversample: int = 8,
+        svd_sample_size: int = 10000,
+        random_state: int = 42,
+        metric: str = "euclidean",
+        p: float = 2
+    ):
+        """
+        Initialize neighbor index
+
+        Args:
+            mode: exact or approximate
+            leaf_size: KD-tree leaf size
+            projection_dims: Principal components kept in approximate mode
+                (defaults to half the feature count, at least 2)
+            oversample: Candidates fetched per requested neighbor in
+                approximate mode
+            svd_sample_size: Rows used to estimate the projection
+            random_state: Seed for the projection sample
+            metric: Distance metric (one of METRICS)
+            p: Minkowski power (minkowski metric only)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown neighbor index mode: {mode}")
+        if metric not in self.METRICS:
+            raise UnsupportedMetricError(f"Unsupported neighbor metric: {metric}")
+        if mode == "approximate" and metric != "euclidean":
+            raise UnsupportedMetricError("Approximate neighbor search only supports the euclidean metric")
+
+        self.mode = mode
+        self.leaf_size = leaf_size
+        self.projection_dims = projection_dims
+        self.oversample = oversample
+        self.svd_sample_size = svd_sample_size
+        self.random_state = random_state
+        self.metric = metric
+        self.p = p
+
+        self._data = None
+        self._tree = None
+        self._mean = None
+        self._projection = None
+
+    @property
+    def data(self) -> np.ndarray:
+        """Indexed reference rows"""
+        return self._data
+
+    def fit(self, X: np.ndarray) -> "NeighborIndex":
+        """Index the reference rows"""
+        self._data = np.ascontiguousarray(X, dtype=np.float64)
+
+        if self.mode == "exact":
+            self._tree = self._exact_tree()
+            return self
+
+        n_rows, n_features = self._data.shape
+        dims = self.projection_dims or max(2, n_features // 2)
+        dims = min(dims, n_features)
+
+        sample = self._data
+        if n_rows > self.svd_sample_size:
+            rng = np.random.default_rng(self.random_state)
+            sample = self._data[rng.choice(n_rows, self.svd_sample_size, replace=False)]
+
+        self._mean = sample.mean(axis=0)
+        _, _, components = np.linalg.svd(sample - self._mean, full_matrices=False)
+        self._projection = np.ascontiguousarray(components[:dims].T)
+        self._tree = KDTree(self._project(self._data), leaf_size=self.leaf_size)
+        return self
+
+    def query(self, X: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest reference rows for each query row
+
+        Returns:
+            (distances, indices), each of shape (n_queries, k), nearest first
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if self.mode == "exact":
+            return self._tree.query(X, k=k)
+
+        n_candidates = min(len(self._data), k * self.oversample)
+        _, candidates = self._tree.query(self._project(X), k=n_candidates)
+
+        diffs = self._data[candidates] - X[:, np.newaxis, :]
+        distances = np.sqrt(np.einsum('ijk,ijk->ij', diffs, diffs))
+
+        order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+        return (
+            np.take_along_axis(distances, order, axis=1),
+            np.take_along_axis(candidates, order, axis=1)
+        )
+
+    def recall(self, X: np.ndarray, k: int) -> Dict:
+        """
+        Compare query results with exact search
+
+        Returns:
+            recall_at_k (share of true neighbors found) and
+            kth_distance_ratio (found k-th distance over true k-th distance)
+        """
+        distances, indices = self.query(X, k)
+        if self.mode == "exact":
+            return {'recall_at_k': 1.0, 'kth_distance_ratio': 1.0}
+
+        exact_distances, exact_indices = self._exact_tree().query(X, k=k)
+        found = [
+            len(set(row).intersection(exact_row))
+            for row, exact_row in zip(indices.tolist(), exact_indices.tolist())
+        ]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(exact_distances[:, -1] > 0, distances[:, -1] / exact_distances[:, -1], 1.0)
+
+        return {
+            'recall_at_k': round(float(np.mean(found)) / k, 4),
+            'kth_distance_ratio': round(float(np.mean(ratios)), 4)
+        }
+
+    def _exact_tree(self) -> KDTree:
+        options = {'p': self.p} if self.metric == "minkowski" else {}
+        return KDTree(self._data, leaf_size=self.leaf_size, metric=self.metric, **options)
+
+    def _project(self, X: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray((X - self._mean) @ self._projection)
+
+
+class NeighborScorer:
+    """
+    Index-backed scoring for fitted pyod KNN and LOF detectors
+
+    Reuses the detector's fitted statistics (threshold, and for LOF the
+    training k-distances and local reachability densities) and replaces only
+    the neighbor search, which pyod runs row by row.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        index: NeighborIndex,
+        n_neighbors: int,
+        threshold: float,
+        method: str = "largest",
+        k_distance: Optional[np.ndarray] = None,
+        lrd: Optional[np.ndarray] = None
+    ):
+        """
+        Initialize from fitted statistics (use from_pyod to build one)
+
+        Args:
+            kind: knn or lof
+            index: Neighbor index over the training rows
+            n_neighbors: Neighbors per query
+            threshold: Outlier score threshold (score above means anomaly)
+            method: KNN distance aggregation (largest, mean, median)
+            k_distance: LOF k-distance of each training row
+            lrd: LOF local reachability density of each training row
+        """
+        self.kind = kind
+        self.index = index
+        self.n_neighbors = n_neighbors
+        self.threshold = threshold
+        self.method = method
+        self.k_distance = k_distance
+        self.lrd = lrd
+
+    @classmethod
+    def from_pyod(cls, model, X_train: Optional[np.ndarray] = None, mode: str = "exact", **index_options) -> "NeighborScorer":
+        """
+        Build a scorer from a fitted pyod KNN or LOF detector
+
+        The index uses the detector's own distance metric.
+
+        Args:
+            model: Fitted pyod.models.knn.KNN or pyod.models.lof.LOF
+            X_train: Rows the detector was fitted on (read from the
+                detector if omitted)
+            mode: Neighbor index mode
+            **index_options: Extra NeighborIndex arguments
+
+        Raises:
+            ValueError: If the detector type is unsupported
+            UnsupportedMetricError: If the index can't use its metric
+        """
+        name = type(model).__name__
+        if name not in ('KNN', 'LOF'):
+            raise ValueError(f"Unsupported detector type: {name}")
+        index_options = {**index_options, **_detector_metric(model)}
+
+        if name == 'KNN':
+            if X_train is None:
+                X_train = model.neigh_._fit_X
+            index = NeighborIndex(mode, **index_options).fit(X_train)
+            return cls('knn', index, model.n_neighbors, float(model.threshold_), method=model.method)
+
+        detector = model.detector_
+        if X_train is None:
+            X_train = detector._fit_X
+        k = detector.n_neighbors_
+        index = NeighborIndex(mode, **index_options).fit(X_train)
+        return cls(
+            'lof',
+            index,
+            k,
+            float(model.threshold_),
+            k_distance=np.asarray(detector._distances_fit_X_[:, k - 1]),
+            lrd=np.asarray(detector._lrd)
+        )
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Outlier scores, same convention as pyod (higher is more anomalous)"""
+        distances, indices = self.index.query(X, self.n_neighbors)
+
+        if self.kind == 'knn':
+            if self.method == 'mean':
+                return distances.mean(axis=1)
+            elif self.method == 'median':
+                return np.median(distances, axis=1)
+            return distances[:, -1]
+
+        # Local outlier factor, as sklearn LocalOutlierFactor.score_samples
+        reach_distances = np.maximum(distances, self.k_distance[indices])
+        query_lrd = 1.0 / (np.mean(reach_distances, axis=1) + 1e-10)
+        return np.mean(self.lrd[indices] / query_lrd[:, np.newaxis], axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Outlier labels (1 = anomaly, 0 = normal)"""
+        return (self.decision_function(X) > self.threshold).astype(int)
+
+    def report(self, X: np.ndarray, reference_model=None) -> Dict:
+        """
+        Accuracy of this scorer against exact neighbor search
+
+        Args:
+            X: Query rows
+            reference_model: The fitted pyod detector, to compare scores
+                and labels with
+
+        Returns:
+            Index recall plus, with a reference model, label agreement and
+            maximum absolute score difference
+        """
+        report = {
+            'mode': self.index.mode,
+            'n_queries': len(X),
+            **self.index.recall(X, self.n_neighbors)
+        }
+
+        if reference_model is not None and len(X):
+            scores = self.decision_function(X)
+            reference = reference_model.decision_function(X)
+            report['label_agreement'] = round(
+                float(np.mean((scores > self.threshold) == (reference > self.threshold))), 4
+            )
+            report['max_score_difference'] = float(np.max(np.abs(scores - reference)))
+
+        return report
+
+
+_METRIC_ALIASES = {
+    'l2': 'euclidean',
+    'l1': 'manhattan',
+    'cityblock': 'manhattan',
+    'infinity': 'chebyshev'
+}
+
+
+def _detector_metric(model) -> Dict:
+    """NeighborIndex metric options equivalent to a pyod detector's metric"""
+    metric = getattr(model, 'metric', 'minkowski')
+    p = getattr(model, 'p', 2)
+    if not isinstance(metric, str) or getattr(model, 'metric_params', None):
+        raise UnsupportedMetricError(f"Unsupported neighbor metric: {metric!r}")
+
+    metric = _METRIC_ALIASES.get(metric, metric)
+    if metric == 'minkowski':
+        if p == 1:
+            metric = 'manhattan'
+        elif p == 2:
+            metric = 'euclidean'
+        else:
+            return {'metric': 'minkowski', 'p': p}
+
+    if metric not in NeighborIndex.METRICS:
+        raise UnsupportedMetricError(f"Unsupported neighbor metric: {metric}")
+    return {'metric': metric}
@@ -5,23 +5,57 @@ Statistical benchmarking with predictive modeling
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from scipy import stats
 
+from models.benchmark_stats import BenchmarkStats
+from models.quantile_sketch import QuantileSketch
+from models.segment_index import SegmentIndex
+
 class PerformanceBenchmarker:
     """
     Calculate and compare performance against statistical benchmarks
+
+    Each benchmark keeps one of three distributions for percentile ranks:
+    "summary" (the stored percentiles, interpolated piecewise), "sorted"
+    (every value, exact rank by binary search) or "sketch" (a bounded-size
+    QuantileSketch with accurate tails).
+
+    New values (update_benchmark) and partial benchmarks built elsewhere
+    (merge) are folded in through mergeable running statistics, created
+    for a benchmark the first time it changes, without revisiting the data
+    it was built from. Benchmarks themselves stay plain dictionaries.
+
+    Comparisons use the exact segment's benchmark when there is one and
+    otherwise fall back through the segment hierarchy (e.g. role +
+    department + level, then role + department, then role, then global).
     """
 
-    def __init__(self):
-        """Initialize performance benchmarker"""
+    DISTRIBUTIONS = ("summary", "sorted", "sketch")
+
+    def __init__(
+        self,
+        segment_dimensions: Sequence[str] = ('role', 'department', 'level'),
+        min_sample_size: int = 10
+    ):
+        """
+        Initialize performance benchmarker
+
+        Args:
+            segment_dimensions: Segment hierarchy used for fallback, broadest first
+            min_sample_size: Smallest benchmark sample a comparison will use
+        """
         self.benchmarks = {}
+        self.min_sample_size = min_sample_size
+        self._stats = {}
+        self.segment_index = SegmentIndex(segment_dimensions)
 
     def create_benchmark(
         self,
         data: pd.DataFrame,
         metric_name: str,
-        segment_by: Dict[str, any] = None
+        segment_by: Dict[str, any] = None,
+        distribution: str = "summary"
     ) -> Dict:
         """
         Create statistical benchmark from historical data
@@ -30,16 +64,21 @@ class PerformanceBenchmarker:
             data: DataFrame with performance metrics
             metric_name: Name of the metric to benchmark
             segment_by: Dictionary specifying segmentation (role, dept, level)
+            distribution: Distribution kept for percentile ranks
+                (summary, sorted or sketch)
 
         Returns:
             Benchmark statistics
         """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown benchmark distribution: {distribution}")
+
         # Filter data by segment if specified
         if segment_by:
-            mask = pd.Series([True] * len(data))
+            mask = np.ones(len(data), dtype=bool)
             for key, value in segment_by.items():
                 if key in data.columns:
-                    mask &= (data[key] == value)
+                    mask &= (data[key] == value).to_numpy()
             segmented_data = data[mask]
         else:
             segmented_data = data
@@ -47,33 +86,204 @@ class PerformanceBenchmarker:
         if len(segmented_data) == 0:
             raise ValueError("No data available for specified segment")
 
-        metric_values = segmented_data[metric_name].dropna()
+        metric_values = segmented_data[metric_name].to_numpy(dtype=np.float64)
+        metric_values = metric_values[~np.isnan(metric_values)]
 
         if len(metric_values) < 10:
             raise ValueError(f"Insufficient data points ({len(metric_values)}) for reliable benchmark")
 
-        # Calculate statistics
+        benchmark = self._build_benchmark(
+            metric_name,
+            segment_by or {},
+            metric_values,
+            len(segmented_data),
+            distribution
+        )
+
+        # Store benchmark
+        self._store_benchmark(benchmark)
+
+        return benchmark
+
+    def create_benchmarks(
+        self,
+        data: pd.DataFrame,
+        metric_names: List[str],
+        segment_columns: List[str],
+        distribution: str = "summary",
+        min_sample_size: int = 10
+    ) -> List[Dict]:
+        """
+        Create benchmarks for every segment and metric in one pass
+
+        Rows are grouped once by the segment columns; each group's values
+        are sorted once per metric and all statistics are read from that
+        sorted array. Results equal create_benchmark for each segment.
+
+        Args:
+            data: DataFrame with performance metrics
+            metric_names: Metrics to benchmark
+            segment_columns: Columns whose value combinations form segments
+                (e.g. ['role', 'department', 'level'])
+            distribution: Distribution kept for percentile ranks
+            min_sample_size: Segments with fewer non-null values are skipped
+
+        Returns:
+            Created benchmarks (also registered in self.benchmarks)
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown benchmark distribution: {distribution}")
+
+        segment_columns = [column for column in segment_columns if column in data.columns]
+        if segment_columns:
+            groups = data.groupby(segment_columns, sort=False).indices.items()
+        else:
+            groups = [((), np.arange(len(data)))]
+
+        created = []
+        columns = {metric_name: data[metric_name].to_numpy(dtype=np.float64) for metric_name in metric_names}
+
+        for key, positions in groups:
+            key = key if isinstance(key, tuple) else (key,)
+            segment = {
+                column: value.item() if isinstance(value, np.generic) else value
+                for column, value in zip(segment_columns, key)
+            }
+
+            for metric_name, values in columns.items():
+                metric_values = values[positions]
+                metric_values = metric_values[~np.isnan(metric_values)]
+                if len(metric_values) < max(min_sample_size, 2):
+                    continue
+
+                benchmark = self._build_benchmark(metric_name, segment, metric_values, len(positions), distribution)
+                self._store_benchmark(benchmark)
+                created.append(benchmark)
+
+        return created
+
+    def _build_benchmark(
+        self,
+        metric_name: str,
+        segment: Dict,
+        metric_values: np.ndarray,
+        data_points: int,
+        distribution: str
+    ) -> Dict:
+        """
+        Calculate benchmark statistics from a segment's non-null values
+
+        Sorts the values once; percentiles, extremes and the stored
+        distribution are all taken from the sorted array.
+        """
+        sorted_values = np.sort(metric_values)
+        p25, p50, p75, p90 = np.percentile(sorted_values, [25, 50, 75, 90])
+
         benchmark = {
             'metric_name': metric_name,
-            'segment': segment_by or {},
+            'segment': segment,
             'sample_size': len(metric_values),
-            'percentile_25': float(np.percentile(metric_values, 25)),
-            'percentile_50': float(np.percentile(metric_values, 50)),
-            'percentile_75': float(np.percentile(metric_values, 75)),
-            'percentile_90': float(np.percentile(metric_values, 90)),
-            'mean': float(metric_values.mean()),
-            'standard_deviation': float(metric_values.std()),
-            'min_value': float(metric_values.min()),
-            'max_value': float(metric_values.max()),
-            'data_points': len(segmented_data)
+            'percentile_25': float(p25),
+            'percentile_50': float(p50),
+            'percentile_75': float(p75),
+            'percentile_90': float(p90),
+            'mean': float(np.mean(metric_values)),
+            'standard_deviation': float(np.std(metric_values, ddof=1)) if len(metric_values) > 1 else 0.0,
+            'min_value': float(sorted_values[0]),
+            'max_value': float(sorted_values[-1]),
+            'data_points': data_points,
+            'distribution': distribution
         }
+        self._attach_distribution(benchmark, sorted_values)
+        return benchmark
 
-        # Store benchmark
-        benchmark_key = self._get_benchmark_key(metric_name, segment_by)
-        self.benchmarks[benchmark_key] = benchmark
+    def update_benchmark(
+        self,
+        metric_name: str,
+        values: np.ndarray,
+        segment_by: Dict[str, any] = None,
+        distribution: str = "summary"
+    ) -> Dict:
+        """
+        Fold new metric values into a benchmark
+
+        Count, mean, standard deviation and extremes stay exact. Percentiles
+        stay exact for sorted benchmarks and are read from a quantile sketch
+        otherwise (seeded from the stored percentiles for summary
+        benchmarks). A missing benchmark is created from the values.
 
+        Args:
+            metric_name: Benchmarked metric
+            values: New metric values (NaN counts as a data point only)
+            segment_by: Segmentation of the benchmark
+            distribution: Distribution of a newly created benchmark
+
+        Returns:
+            Updated benchmark
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        data_points = len(values)
+        values = values[~np.isnan(values)]
+
+        benchmark = self.get_benchmark(metric_name, segment_by)
+        if benchmark is None:
+            if distribution not in self.DISTRIBUTIONS:
+                raise ValueError(f"Unknown benchmark distribution: {distribution}")
+            if len(values) == 0:
+                raise ValueError(f"No values to benchmark {metric_name}")
+            benchmark = self._build_benchmark(metric_name, segment_by or {}, values, data_points, distribution)
+            self._store_benchmark(benchmark)
+            return benchmark
+
+        key = self._get_benchmark_key(metric_name, segment_by)
+        running = self._stats.get(key)
+        if running is None:
+            running = self._stats[key] = self._benchmark_stats(benchmark)
+
+        running.update(values)
+        if benchmark['distribution'] == 'sorted':
+            benchmark['sorted_values'] = np.sort(np.concatenate([benchmark['sorted_values'], values]), kind='stable')
+        benchmark['data_points'] += data_points
+        self._refresh_benchmark(benchmark, running)
         return benchmark
 
+    def merge(self, other: "PerformanceBenchmarker") -> "PerformanceBenchmarker":
+        """
+        Fold another benchmarker's benchmarks into this one
+
+        Benchmarks for the same metric and segment are combined as if built
+        from the union of their data (e.g. per-shard or per-tenant partial
+        benchmarks); the rest are copied. Merging a sorted benchmark with a
+        non-sorted one leaves a sketch benchmark.
+
+        Returns:
+            This benchmarker
+        """
+        for key, theirs in other.benchmarks.items():
+            their_running = other._stats.get(key)
+            mine = self.benchmarks.get(key)
+            if mine is None:
+                self._copy_benchmark(theirs, their_running)
+                continue
+
+            running = self._stats.get(key)
+            if running is None:
+                running = self._stats[key] = self._benchmark_stats(mine)
+            running.merge(their_running if their_running is not None else other._benchmark_stats(theirs))
+
+            if mine['distribution'] == 'sorted' and theirs['distribution'] == 'sorted':
+                mine['sorted_values'] = np.sort(
+                    np.concatenate([mine['sorted_values'], theirs['sorted_values']]), kind='stable'
+                )
+            elif mine['distribution'] == 'sorted':
+                del mine['sorted_values']
+                mine['distribution'] = 'sketch'
+                mine['sketch'] = running.sketch
+            mine['data_points'] += theirs['data_points']
+            self._refresh_benchmark(mine, running)
+
+        return self
+
     def compare_to_benchmark(
         self,
         user_value: float,
@@ -89,16 +299,15 @@ class PerformanceBenchmarker:
             segment_by: Segmentation for benchmark selection
 
         Returns:
-            Comparison results with insights
+            Comparison results with insights, including the segment level
+            of the benchmark that was used
         """
         # Get benchmark
-        benchmark_key = self._get_benchmark_key(metric_name, segment_by)
+        benchmark = self.resolve_benchmark(metric_name, segment_by)
 
-        if benchmark_key not in self.benchmarks:
+        if benchmark is None:
             raise ValueError(f"Benchmark not found for {metric_name} with specified segment")
 
-        benchmark = self.benchmarks[benchmark_key]
-
         # Calculate percentile rank
         percentile_rank = self._calculate_percentile_rank(
             user_value,
@@ -151,56 +360,278 @@ class PerformanceBenchmarker:
             },
             'strengths': strengths,
             'improvement_areas': improvement_areas,
-            'recommendations': recommendations
+            'recommendations': recommendations,
+            'benchmark_level': self._benchmark_level(benchmark),
+            'benchmark_segment': benchmark['segment']
         }
 
+    def resolve_benchmark(self, metric_name: str, segment_by: Dict[str, any] = None) -> Optional[Dict]:
+        """
+        Find the benchmark a segment is compared against
+
+        Uses the exact segment's benchmark if it has at least
+        min_sample_size values, otherwise the most specific usable
+        benchmark along the segment hierarchy.
+
+        Returns:
+            Benchmark, or None if no level has one
+        """
+        benchmark = self.benchmarks.get(self._get_benchmark_key(metric_name, segment_by))
+        if benchmark is not None and benchmark['sample_size'] >= self.min_sample_size:
+            return benchmark
+
+        benchmark, _ = self.segment_index.resolve(metric_name, segment_by, self.min_sample_size)
+        return benchmark
+
     def batch_compare(
         self,
         users_data: pd.DataFrame,
         metric_name: str,
-        segment_by_column: str = None
+        segment_by_column: Union[str, List[str]] = None,
+        include_insights: bool = False
     ) -> pd.DataFrame:
         """
         Compare multiple users to benchmarks in batch
 
+        Rows are grouped by segment and each group is ranked against the
+        benchmark resolve_benchmark picks for it, with array operations;
+        rows with no benchmark at any segment level are skipped. Values
+        match compare_to_benchmark per row.
+
         Args:
             users_data: DataFrame with user IDs and metric values
             metric_name: Metric to compare
-            segment_by_column: Column to use for segmentation
+            segment_by_column: Column (or columns) to use for segmentation
+            include_insights: Also return strengths, improvement areas and
+                recommendations per user
 
         Returns:
             DataFrame with comparison results
         """
-        results = []
-
-        for idx, row in users_data.iterrows():
-            user_value = row[metric_name]
+        values = users_data[metric_name].to_numpy(dtype=np.float64)
+        percentile_ranks = np.full(len(users_data), np.nan)
+        z_scores = np.zeros(len(users_data))
+        benchmark_index = np.full(len(users_data), -1)
+        benchmarks = []
+
+        if isinstance(segment_by_column, str):
+            segment_by_column = [segment_by_column]
+        segment_columns = [column for column in segment_by_column or [] if column in users_data.columns]
+
+        if segment_columns:
+            groups = users_data.groupby(segment_columns, sort=False, dropna=False).indices.items()
+            segments = [
+                (dict(zip(segment_columns, key if isinstance(key, tuple) else (key,))), positions)
+                for key, positions in groups
+            ]
+        else:
+            segments = [({}, np.arange(len(users_data)))]
 
-            # Determine segment
-            segment = {}
-            if segment_by_column and segment_by_column in row:
-                segment[segment_by_column] = row[segment_by_column]
+        for segment, positions in segments:
+            benchmark = self.resolve_benchmark(metric_name, segment)
+            if benchmark is None:
+                # Skip if benchmark not available
+                continue
 
-            try:
-                comparison = self.compare_to_benchmark(
-                    user_value,
-                    metric_name,
-                    segment
+            group_values = values[positions]
+            percentile_ranks[positions] = self._calculate_percentile_ranks(group_values, benchmark)
+            if benchmark['standard_deviation'] > 0:
+                z_scores[positions] = (group_values - benchmark['mean']) / benchmark['standard_deviation']
+            benchmark_index[positions] = len(benchmarks)
+            benchmarks.append(benchmark)
+
+        found = benchmark_index >= 0
+        values = values[found]
+        percentile_ranks = percentile_ranks[found]
+
+        results = pd.DataFrame({
+            'user_id': users_data['user_id'].to_numpy()[found] if 'user_id' in users_data.columns else None,
+            'user_value': [round(value, 2) for value in values.tolist()],
+            'percentile_rank': [round(rank, 2) for rank in percentile_ranks.tolist()],
+            'performance_level': np.select(
+                [percentile_ranks >= 90, percentile_ranks >= 75, percentile_ranks >= 25],
+                ["EXCEPTIONAL", "ABOVE", "AT"],
+                "BELOW"
+            ),
+            'relative_position': np.select(
+                [percentile_ranks >= 90, percentile_ranks >= 75, percentile_ranks >= 25, percentile_ranks >= 10],
+                ["TOP_10", "TOP_25", "MIDDLE_50", "BOTTOM_25"],
+                "BOTTOM_10"
+            ),
+            'z_score': [round(z, 2) for z in z_scores[found].tolist()],
+            'benchmark_level': [self._benchmark_level(benchmarks[index]) for index in benchmark_index[found].tolist()]
+        })
+
+        if include_insights:
+            strengths, improvement_areas, recommendations = [], [], []
+            rows = zip(values.tolist(), percentile_ranks.tolist(), benchmark_index[found].tolist(), results['performance_level'])
+            for value, rank, index, level in rows:
+                benchmark = benchmarks[index]
+                row_strengths, row_improvements = self._generate_insights(value, benchmark, rank)
+                strengths.append(row_strengths)
+                improvement_areas.append(row_improvements)
+                recommendations.append(
+                    self._generate_recommendations(level, value - benchmark['mean'], row_improvements)
                 )
+            results['strengths'] = strengths
+            results['improvement_areas'] = improvement_areas
+            results['recommendations'] = recommendations
 
-                results.append({
-                    'user_id': row.get('user_id'),
-                    'user_value': comparison['user_value'],
-                    'percentile_rank': comparison['percentile_rank'],
-                    'performance_level': comparison['performance_level'],
-                    'relative_position': comparison['relative_position'],
-                    'z_score': comparison['z_score']
-                })
-            except ValueError:
-                # Skip if benchmark not available
-                continue
+        return results
+
+    def _calculate_percentile_ranks(self, values: np.ndarray, benchmark: Dict) -> np.ndarray:
+        """
+        Vectorized _calculate_percentile_rank for values against one benchmark
+
+        Returns:
+            Percentile ranks (0-100)
+        """
+        distribution = benchmark.get('distribution', 'summary')
+        if distribution == 'sorted':
+            # Inverse of np.percentile's linear interpolation, by binary search
+            sorted_values = benchmark['sorted_values']
+            ranks = np.linspace(0, 100, len(sorted_values)) if len(sorted_values) > 1 else np.array([100.0])
+            return np.interp(values, sorted_values, ranks)
+        elif distribution == 'sketch':
+            return benchmark['sketch'].rank(values) * 100
+
+        low, p25, p50, p75, p90, high = (
+            benchmark['min_value'],
+            benchmark['percentile_25'],
+            benchmark['percentile_50'],
+            benchmark['percentile_75'],
+            benchmark['percentile_90'],
+            benchmark['max_value']
+        )
+
+        # Every segment is evaluated for every value; np.select keeps the
+        # one whose range the value falls in, which never divides by zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.select(
+                [values <= p25, values <= p50, values <= p75, values <= p90],
+                [
+                    np.where(values <= low, 0, 25 * (values - low) / (p25 - low)),
+                    25 + 25 * (values - p25) / (p50 - p25),
+                    50 + 25 * (values - p50) / (p75 - p50),
+                    75 + 15 * (values - p75) / (p90 - p75)
+                ],
+                np.where(values >= high, 100, 90 + 10 * (values - p90) / (high - p90))
+            )
+
+    def get_quantile(self, metric_name: str, percentile: float, segment_by: Dict[str, any] = None) -> float:
+        """
+        Get any percentile of a benchmark without touching raw data
+
+        Exact for sorted benchmarks, approximate for sketches, and piecewise
+        linear between the stored percentiles for summaries.
+
+        Args:
+            metric_name: Benchmarked metric
+            percentile: Percentile in [0, 100]
+            segment_by: Segmentation of the benchmark
 
-        return pd.DataFrame(results)
+        Returns:
+            Metric value at that percentile
+        """
+        benchmark = self.get_benchmark(metric_name, segment_by)
+        if benchmark is None:
+            raise ValueError(f"Benchmark not found for {metric_name} with specified segment")
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentile must be between 0 and 100")
+
+        distribution = benchmark.get('distribution', 'summary')
+        if distribution == 'sorted':
+            values = benchmark['sorted_values']
+            # Same linear interpolation as np.percentile
+            return float(np.interp(percentile / 100 * (len(values) - 1), np.arange(len(values)), values))
+        elif distribution == 'sketch':
+            return benchmark['sketch'].quantile(percentile / 100)
+
+        ranks, values = self._summary_points(benchmark)
+        return float(np.interp(percentile, ranks, values))
+
+    def _attach_distribution(self, benchmark: Dict, sorted_values: np.ndarray):
+        """Store the benchmark's chosen distribution of (sorted) metric values"""
+        if benchmark['distribution'] == 'sorted':
+            benchmark['sorted_values'] = sorted_values
+        elif benchmark['distribution'] == 'sketch':
+            benchmark['sketch'] = QuantileSketch().update(sorted_values)
+
+    def _benchmark_stats(self, benchmark: Dict) -> BenchmarkStats:
+        """
+        Running statistics equivalent to an existing benchmark
+
+        Moments and extremes are exact. A sketch benchmark shares its
+        sketch; a summary benchmark's sketch is seeded from its stored
+        percentiles.
+        """
+        if benchmark['distribution'] == 'sketch':
+            sketch = benchmark['sketch']
+        elif benchmark['distribution'] == 'sorted':
+            sketch = QuantileSketch().update(benchmark['sorted_values'])
+        else:
+            # Evenly weighted centroids along the piecewise-linear
+            # distribution the summary percentiles describe
+            compression = QuantileSketch().compression
+            ranks, values = self._summary_points(benchmark)
+            centers = np.linspace(0, 100, 2 * compression + 1)[1::2]
+            sketch = QuantileSketch.from_dict({
+                'compression': compression,
+                'count': benchmark['sample_size'],
+                'min': benchmark['min_value'],
+                'max': benchmark['max_value'],
+                'means': np.interp(centers, ranks, values),
+                'weights': np.full(len(centers), benchmark['sample_size'] / len(centers))
+            })
+
+        return BenchmarkStats.from_summary(
+            benchmark['sample_size'],
+            benchmark['mean'],
+            benchmark['standard_deviation'],
+            benchmark['min_value'],
+            benchmark['max_value'],
+            sketch
+        )
+
+    def _refresh_benchmark(self, benchmark: Dict, running: BenchmarkStats):
+        """Recalculate a benchmark's summary fields from its running statistics"""
+        if benchmark['distribution'] == 'sorted':
+            percentiles = np.percentile(benchmark['sorted_values'], [25, 50, 75, 90])
+        else:
+            percentiles = running.sketch.quantile(np.array([0.25, 0.5, 0.75, 0.9]))
+
+        benchmark['sample_size'] = running.count
+        for name, value in zip(('percentile_25', 'percentile_50', 'percentile_75', 'percentile_90'), percentiles):
+            benchmark[name] = float(value)
+        benchmark['mean'] = running.mean
+        benchmark['standard_deviation'] = running.standard_deviation
+        benchmark['min_value'] = running.min
+        benchmark['max_value'] = running.max
+
+    def _copy_benchmark(self, benchmark: Dict, running: Optional[BenchmarkStats] = None):
+        """Store a copy of another benchmarker's benchmark (and its statistics)"""
+        copy = dict(benchmark, segment=dict(benchmark['segment']))
+        if running is not None:
+            running = running.copy()
+            if copy['distribution'] == 'sketch':
+                copy['sketch'] = running.sketch
+        elif copy['distribution'] == 'sketch':
+            copy['sketch'] = QuantileSketch.from_dict(copy['sketch'].to_dict())
+
+        self._store_benchmark(copy)
+        if running is not None:
+            self._stats[self._get_benchmark_key(copy['metric_name'], copy['segment'])] = running
+
+    def _summary_points(self, benchmark: Dict) -> Tuple[List[float], List[float]]:
+        """Percentile ranks and values of the stored summary statistics"""
+        return [0, 25, 50, 75, 90, 100], [
+            benchmark['min_value'],
+            benchmark['percentile_25'],
+            benchmark['percentile_50'],
+            benchmark['percentile_75'],
+            benchmark['percentile_90'],
+            benchmark['max_value']
+        ]
 
     def _calculate_percentile_rank(self, value: float, benchmark: Dict) -> float:
         """
@@ -209,6 +640,9 @@ class PerformanceBenchmarker:
         Returns:
             Percentile rank (0-100)
         """
+        if benchmark.get('distribution', 'summary') != 'summary':
+            return float(self._calculate_percentile_ranks(np.array([value], dtype=np.float64), benchmark)[0])
+
         # Interpolate between percentiles
         if value <= benchmark['percentile_25']:
             if value <= benchmark['min_value']:
@@ -337,6 +771,22 @@ class PerformanceBenchmarker:
 
         return recommendations
 
+    def _store_benchmark(self, benchmark: Dict):
+        """Register a benchmark by key and in the segment hierarchy"""
+        key = self._get_benchmark_key(benchmark['metric_name'], benchmark['segment'])
+        self.benchmarks[key] = benchmark
+        self._stats.pop(key, None)
+        self.segment_index.add(benchmark)
+
+    def _benchmark_level(self, benchmark: Dict) -> str:
+        """Name the segment level of a benchmark (e.g. "role+department")"""
+        dimensions = self.segment_index.dimensions
+        order = sorted(
+            benchmark['segment'],
+            key=lambda name: dimensions.index(name) if name in dimensions else len(dimensions)
+        )
+        return "+".join(order) or "global"
+
     def _get_benchmark_key(self, metric_name: str, segment_by: Dict[str, any] = None) -> str:
         """Generate unique key for benchmark"""
         if not segment_by:
@@ -5,33 +5,83 @@ ML-based productivity forecasting using Random Forest and LSTM
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import joblib
 from datetime import datetime, timedelta
 
+from models.feature_schema import Feature, FeatureSchema
+from models.tree_engine import CompiledTreeEnsemble
+
 class ProductivityPredictor:
     """
     Productivity prediction using ensemble ML models
     """
 
-    def __init__(self, model_type: str = "random_forest"):
+    FEATURE_SCHEMA = FeatureSchema([
+        # Activity features
+        Feature('commits_count'),
+        Feature('pr_count'),
+        Feature('code_reviews_given'),
+        Feature('tasks_completed'),
+        Feature('meetings_attended'),
+
+        # Workload features
+        Feature('active_tasks'),
+        Feature('pending_reviews'),
+        Feature('hours_worked', default=40),
+
+        # Collaboration features
+        Feature('messages_sent'),
+        Feature('collaboration_score'),
+
+        # Temporal features
+        Feature('day_of_week', default=1),  # 1-7
+        Feature('is_weekend', default=1, source='day_of_week', transform=lambda day: day >= 6),
+
+        # Historical performance
+        Feature('avg_productivity_7d', default=50),
+        Feature('avg_productivity_30d', default=50),
+        Feature('productivity_trend'),  # slope
+
+        # Engagement indicators
+        Feature('engagement_score', default=50),
+        Feature('sentiment_score'),
+
+        # Velocity metrics
+        Feature('velocity'),
+        Feature('burndown_rate'),
+
+        # Quality metrics
+        Feature('code_quality_score'),
+        Feature('bug_rate')
+    ])
+
+    def __init__(self, model_type: str = "random_forest", use_compiled_engine: bool = False):
         """
         Initialize productivity predictor
 
         Args:
             model_type: Type of model (random_forest, gradient_boosting)
+            use_compiled_engine: Serve predictions from a compiled
+                array-backed copy of the fitted ensemble
         """
         self.model_type = model_type
+        self.use_compiled_engine = use_compiled_engine
         self.scaler = StandardScaler()
-        self.model = None
+        self.model = self._build_model()
+        self.engine = None
         self.feature_importance = {}
         self.feature_names = []
+        self._column_order = None
+        self._leaf_values = None
 
-        if model_type == "random_forest":
-            self.model = RandomForestRegressor(
+    def _build_model(self):
+        """Create an unfitted estimator for the configured model type"""
+        if self.model_type == "random_forest":
+            return RandomForestRegressor(
                 n_estimators=100,
                 max_depth=15,
                 min_samples_split=5,
@@ -39,65 +89,30 @@ class ProductivityPredictor:
                 random_state=42,
                 n_jobs=-1
             )
-        elif model_type == "gradient_boosting":
-            self.model = GradientBoostingRegressor(
+        elif self.model_type == "gradient_boosting":
+            return GradientBoostingRegressor(
                 n_estimators=100,
                 learning_rate=0.1,
                 max_depth=5,
                 random_state=42
             )
+        return None
 
-    def extract_features(self, data: Dict) -> np.ndarray:
+    def extract_features(self, data: Union[Dict, List[Dict], Dict[str, List]]) -> np.ndarray:
         """
         Extract and engineer features from raw data
 
         Args:
-            data: Dictionary with productivity metrics
+            data: Dictionary with productivity metrics, a list of them, or
+                a column-oriented mapping of metric name -> values
 
         Returns:
-            Feature vector
+            Feature matrix in the column order the model was trained with
         """
-        features = []
-
-        # Activity features
-        features.append(data.get('commits_count', 0))
-        features.append(data.get('pr_count', 0))
-        features.append(data.get('code_reviews_given', 0))
-        features.append(data.get('tasks_completed', 0))
-        features.append(data.get('meetings_attended', 0))
-
-        # Workload features
-        features.append(data.get('active_tasks', 0))
-        features.append(data.get('pending_reviews', 0))
-        features.append(data.get('hours_worked', 40))
-
-        # Collaboration features
-        features.append(data.get('messages_sent', 0))
-        features.append(data.get('collaboration_score', 0))
-
-        # Temporal features
-        day_of_week = data.get('day_of_week', 1)  # 1-7
-        features.append(day_of_week)
-        features.append(1 if day_of_week >= 6 else 0)  # is_weekend
-
-        # Historical performance
-        features.append(data.get('avg_productivity_7d', 50))
-        features.append(data.get('avg_productivity_30d', 50))
-        features.append(data.get('productivity_trend', 0))  # slope
-
-        # Engagement indicators
-        features.append(data.get('engagement_score', 50))
-        features.append(data.get('sentiment_score', 0))
-
-        # Velocity metrics
-        features.append(data.get('velocity', 0))
-        features.append(data.get('burndown_rate', 0))
-
-        # Quality metrics
-        features.append(data.get('code_quality_score', 0))
-        features.append(data.get('bug_rate', 0))
-
-        return np.array(features).reshape(1, -1)
+        X = self.FEATURE_SCHEMA.build(data)
+        if self._column_order is not None:
+            X = X[:, self._column_order]
+        return X
 
     def train(self, training_data: pd.DataFrame, target_column: str = 'productivity_score'):
         """
@@ -110,11 +125,27 @@ class ProductivityPredictor:
         Returns:
             Training metrics
         """
-        # Separate features and target
-        X = training_data.drop(columns=[target_column])
-        y = training_data[target_column]
-
-        self.feature_names = X.columns.tolist()
+        # Separate features and target, building the matrix through the
+        # same schema used at serving time
+        sources = list(dict.fromkeys(feature.source for feature in self.FEATURE_SCHEMA.features))
+        unknown = [
+            column for column in training_data.columns
+            if column != target_column and column not in sources and column not in self.FEATURE_SCHEMA.names
+        ]
+        if unknown:
+            raise ValueError(f"Training columns not in feature schema: {unknown}")
+
+        # Schema defaults fill values missing at serving time, never whole
+        # columns absent from training
+        missing = [source for source in sources if source not in training_data.columns]
+        if missing:
+            raise ValueError(f"Feature schema columns missing from training data: {missing}")
+
+        X = self.FEATURE_SCHEMA.build(training_data.drop(columns=[target_column]))
+        y = training_data[target_column].to_numpy()
+
+        self.feature_names = list(self.FEATURE_SCHEMA.names)
+        self._column_order = None
 
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -125,8 +156,14 @@ class ProductivityPredictor:
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
 
-        # Train model
+        # Train model (a fresh one if load_model released it for an engine)
+        if self.model is None:
+            self.model = self._build_model()
         self.model.fit(X_train_scaled, y_train)
+        self._leaf_values = None
+        self.engine = None
+        if self.use_compiled_engine:
+            self.compile_engine(X_test_scaled)
 
         # Calculate feature importance
         if hasattr(self.model, 'feature_importances_'):
@@ -162,27 +199,145 @@ class ProductivityPredictor:
         Returns:
             Prediction with confidence interval
         """
-        if self.model is None:
+        return self.predict_batch([features])[0]
+
+    def predict_batch(self, features: Union[List[Dict], Dict[str, List]]) -> List[Dict]:
+        """
+        Predict productivity scores for many records at once
+
+        Builds one feature matrix and runs a single scaler transform and
+        model predict over it instead of one call per record.
+
+        Args:
+            features: List of feature dictionaries, or a column-oriented
+                mapping of feature name -> list of values
+
+        Returns:
+            List of predictions with confidence intervals, in input order
+        """
+        if self.model is None and self.engine is None:
             raise ValueError("Model not trained. Call train() first.")
 
-        # Extract features
+        # Extract features straight from records or columns
         X = self.extract_features(features)
+        if len(X) == 0:
+            return []
+
+        # Null values are left out of the records used for explanations, so
+        # they count as missing there just as they do in the feature matrix
+        if isinstance(features, dict):
+            features = self._records_from_columns(features)
+        else:
+            features = [self._present_values(record) for record in features]
 
         # Scale features
         X_scaled = self.scaler.transform(X)
 
-        # Predict
-        prediction = self.model.predict(X_scaled)[0]
+        # Predict, with per-tree spread for the confidence interval when
+        # the model is a bagged forest
+        tree_predictions = self._tree_predictions(X_scaled)
+        if tree_predictions is not None:
+            predictions = tree_predictions.mean(axis=1)
+            stds = np.std(tree_predictions, axis=1)
+        elif self.engine is not None:
+            predictions = self.engine.predict(X_scaled)
+            stds = None
+        else:
+            predictions = self.model.predict(X_scaled)
+            stds = None
+
+        return [
+            self._build_prediction(record, prediction, stds[i] if stds is not None else None)
+            for i, (record, prediction) in enumerate(zip(features, predictions))
+        ]
+
+    def compile_engine(self, validation_data: np.ndarray = None):
+        """
+        Compile the fitted ensemble into flat node tables for inference
+
+        The compiled engine is checked against sklearn before it is used,
+        on validation_data if given or otherwise on a synthetic probe in
+        scaled feature space.
+
+        Args:
+            validation_data: Scaled feature rows to validate on
+
+        Raises:
+            ValueError: If the model is not fitted or outputs disagree
+        """
+        if not hasattr(self.model, 'estimators_'):
+            raise ValueError("Model not trained. Call train() first.")
+
+        if validation_data is None:
+            rng = np.random.default_rng(42)
+            validation_data = rng.standard_normal((256, self.model.n_features_in_))
+
+        engine = CompiledTreeEnsemble.from_sklearn(self.model)
+        engine.validate(self.model, validation_data)
+        self.engine = engine
+
+    def _tree_predictions(self, X_scaled: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Get every tree's prediction for every row in one vectorized pass
+
+        With the compiled engine all trees are evaluated over the flat node
+        tables. Otherwise a single apply() call finds each row's leaf in
+        every tree, and a precompiled (n_trees, max_nodes) table of leaf
+        values turns those indices into predictions with one fancy-indexing
+        lookup. Values are exactly what each estimator's predict() would
+        return.
+
+        Returns:
+            Array of shape (n_rows, n_trees), or None if the model is not a
+            fitted random forest
+        """
+        if self.engine is not None:
+            return self.engine.leaf_values(X_scaled) if self.engine.kind == 'random_forest' else None
+
+        if not isinstance(self.model, RandomForestRegressor) or not hasattr(self.model, 'estimators_'):
+            return None
+
+        if self._leaf_values is None:
+            trees = [estimator.tree_ for estimator in self.model.estimators_]
+            table = np.zeros((len(trees), max(tree.node_count for tree in trees)))
+            for i, tree in enumerate(trees):
+                table[i, :tree.node_count] = tree.value[:, 0, 0]
+            self._leaf_values = table
+
+        leaves = self.model.apply(X_scaled)
+        return self._leaf_values[np.arange(leaves.shape[1]), leaves]
+
+    def _records_from_columns(self, columns: Dict[str, List]) -> List[Dict]:
+        """Convert a column-oriented payload into per-record dictionaries"""
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All feature columns must have the same length")
+
+        names = list(columns.keys())
+        return [self._present_values(dict(zip(names, values))) for values in zip(*columns.values())]
+
+    def _present_values(self, record: Dict) -> Dict:
+        """Drop null (None or NaN) values from a record"""
+        return {
+            name: value
+            for name, value in record.items()
+            if value is not None and not (isinstance(value, (float, np.floating)) and np.isnan(value))
+        }
+
+    def _build_prediction(self, features: Dict, prediction: float, std: Optional[float]) -> Dict:
+        """
+        Assemble the prediction result for a single record
+
+        Args:
+            features: Feature dictionary for the record
+            prediction: Model prediction
+            std: Spread of ensemble estimator predictions, if available
+        """
+        prediction = float(prediction)
 
         # Calculate confidence interval using ensemble predictions
-        if hasattr(self.model, 'estimators_'):
-            # For ensemble models, get predictions from all estimators
-            predictions = np.array([
-                estimator.predict(X_scaled)[0]
-                for estimator in self.model.estimators_
-            ])
-
-            std = np.std(predictions)
+        if std is not None:
+            std = float(std)
             confidence_interval = {
                 'lower': prediction - 1.96 * std,
                 'upper': prediction + 1.96 * std
@@ -279,13 +434,34 @@ class ProductivityPredictor:
             'model': self.model,
             'scaler': self.scaler,
             'feature_names': self.feature_names,
-            'feature_importance': self.feature_importance
+            'feature_importance': self.feature_importance,
+            'engine': self.engine.to_dict() if self.engine is not None else None
         }, filepath)
 
-    def load_model(self, filepath: str):
-        """Load model from disk"""
-        data = joblib.load(filepath)
+    def load_model(self, filepath: str, mmap_mode: str = None):
+        """
+        Load model from disk
+
+        With use_compiled_engine the sklearn estimator is released once the
+        engine is ready, so only the compact node tables stay resident.
+
+        Args:
+            filepath: Path written by save_model
+            mmap_mode: joblib memory-map mode (e.g. "r") so worker processes
+                share one physical copy of the stored arrays
+        """
+        data = joblib.load(filepath, mmap_mode=mmap_mode)
         self.model = data['model']
+        self._leaf_values = None
         self.scaler = data['scaler']
         self.feature_names = data['feature_names']
         self.feature_importance = data['feature_importance']
+        self._column_order = self.FEATURE_SCHEMA.column_order(self.feature_names)
+
+        self.engine = None
+        if self.use_compiled_engine or self.model is None:
+            if data.get('engine') is not None:
+                self.engine = CompiledTreeEnsemble.from_dict(data['engine'])
+            else:
+                self.compile_engine()
+            self.model = None
@@ -0,0 +1,161 @@
+"""
+Quantile Sketch
+Mergeable t-digest style summary for approximate quantiles and ranks
+"""
+
+import numpy as np
+from typing import Dict, Iterable, Union
+
+
+class QuantileSketch:
+    """
+    Bounded-memory quantile summary
+
+    Values are kept as weighted centroids. Centroid sizes follow the t-digest
+    arcsine scale function, so centroids are small near the tails (accurate
+    extreme percentiles) and larger near the median, and the number of
+    centroids stays around the compression parameter regardless of how many
+    values were added. Sketches of disjoint data merge into a sketch of the
+    union.
+    """
+
+    def __init__(self, compression: int = 200, buffer_size: int = 10000):
+        """
+        Initialize quantile sketch
+
+        Args:
+            compression: Accuracy/size trade-off (roughly the centroid count)
+            buffer_size: Values buffered before they are compressed
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values: Union[Iterable[float], np.ndarray]) -> "QuantileSketch":
+        """Add values (NaN is ignored)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+
+        if self._buffered >= self.buffer_size:
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch into this one"""
+        other._compress()
+        if other.count == 0:
+            return self
+
+        self._compress()
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self._means, other._means]), np.concatenate([self._weights, other._weights]))
+        return self
+
+    def quantile(self, q: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Estimate quantiles
+
+        Args:
+            q: Quantile(s) in [0, 1]
+        """
+        self._compress()
+        if self.count == 0:
+            raise ValueError("Quantile sketch is empty")
+
+        positions, means = self._cdf_points()
+        result = np.interp(np.asarray(q, dtype=np.float64) * self.count, positions, means)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def rank(self, values: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Estimate the fraction of values at or below each value
+
+        Returns:
+            Rank(s) in [0, 1]
+        """
+        self._compress()
+        if self.count == 0:
+            raise ValueError("Quantile sketch is empty")
+
+        positions, means = self._cdf_points()
+        result = np.interp(np.asarray(values, dtype=np.float64), means, positions) / self.count
+        return float(result) if np.ndim(result) == 0 else result
+
+    def to_dict(self) -> Dict:
+        """Serialize to plain values"""
+        self._compress()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'means': self._means.tolist(),
+            'weights': self._weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        """Restore from to_dict output"""
+        sketch = cls(compression=data['compression'])
+        sketch.count = data['count']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch._means = np.asarray(data['means'], dtype=np.float64)
+        sketch._weights = np.asarray(data['weights'], dtype=np.float64)
+        return sketch
+
+    def __len__(self) -> int:
+        self._compress()
+        return len(self._means)
+
+    def _cdf_points(self):
+        # Each centroid sits at the middle of its cumulative weight, with the
+        # exact min and max pinned at the ends
+        centers = np.cumsum(self._weights) - self._weights / 2
+        positions = np.concatenate([[0.0], centers, [float(self.count)]])
+        means = np.concatenate([[self.min], self._means, [self.max]])
+        return positions, means
+
+    def _compress(self, means: np.ndarray = None, weights: np.ndarray = None):
+        if means is None:
+            if not self._buffer:
+                return
+            buffered = np.concatenate(self._buffer)
+            means = np.concatenate([self._means, buffered])
+            weights = np.concatenate([self._weights, np.ones(len(buffered))])
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Bucket points by the scale function of their cumulative quantile:
+        # k(q) = compression / (2 pi) * asin(2q - 1), one unit of k per centroid
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        buckets = np.floor(k - k[0]).astype(np.int64)
+
+        bucket_weights = np.bincount(buckets, weights=weights)
+        bucket_sums = np.bincount(buckets, weights=weights * means)
+        used = bucket_weights > 0
+
+        self._weights = bucket_weights[used]
+        self._means = bucket_sums[used] / self._weights
@@ -0,0 +1,170 @@
+"""
+Analysis Result Cache
+Content-addressed LRU + TTL cache with an optional shared Redis tier
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+
+class ResultCache:
+    """
+    Two-tier cache for model results keyed by input content
+
+    Keys are SHA-256 digests of a namespace (the model identifiers) and the
+    normalized input, so results computed by a different model never match.
+    The in-process tier is a bounded LRU with per-entry expiry; the optional
+    Redis tier is shared across workers and expires entries with the same TTL.
+    Both tiers hold serialized results, so every lookup returns a fresh
+    object and callers can't alter cached entries.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600,
+        redis_url: Optional[str] = None
+    ):
+        """
+        Initialize result cache
+
+        Args:
+            namespace: Model identifiers included in every key
+            max_entries: Capacity of the in-process LRU tier (0 disables it)
+            ttl_seconds: Time-to-live for cached results
+            redis_url: Redis connection URL for the shared tier
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'redis_hits': 0,
+            'redis_errors': 0,
+            'evictions': 0
+        }
+
+        self._redis = None
+        if redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url)
+
+    def make_key(self, content: str) -> str:
+        """Build the cache key for normalized input content"""
+        digest = hashlib.sha256(f"{self.namespace}\0{content}".encode("utf-8")).hexdigest()
+        return f"pms-ml:{digest}"
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Look up cached results
+
+        Returns:
+            Mapping of found keys to results; missing keys are omitted
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+            self._stats['hits'] += len(found)
+
+        remaining = [key for key in keys if key not in found]
+        if remaining and self._redis is not None:
+            shared = self._get_shared(remaining)
+            if shared:
+                self._put_local(shared)
+                found.update(shared)
+                remaining = [key for key in remaining if key not in shared]
+
+        found = {key: json.loads(value) for key, value in found.items()}
+
+        with self._lock:
+            self._stats['misses'] += len(remaining)
+
+        return found
+
+    def set_many(self, items: Dict[str, Dict]):
+        """Store results in every enabled tier"""
+        if not items:
+            return
+
+        serialized = {key: json.dumps(value) for key, value in items.items()}
+        self._put_local(serialized)
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key, value in serialized.items():
+                    pipe.setex(key, int(self.ttl_seconds), value)
+                pipe.execute()
+            except Exception:
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+
+    def clear(self):
+        """Drop all entries from the in-process tier"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['redis_hits'] + self._stats['misses']
+            hit_rate = (self._stats['hits'] + self._stats['redis_hits']) / lookups if lookups else 0.0
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': round(hit_rate, 4),
+                'redis_enabled': self._redis is not None
+            }
+
+    def _get_shared(self, keys):
+        try:
+            values = self._redis.mget(keys)
+        except Exception:
+            with self._lock:
+                self._stats['redis_errors'] += 1
+            return {}
+
+        shared = {
+            key: value
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+        with self._lock:
+            self._stats['redis_hits'] += len(shared)
+        return shared
+
+    def _put_local(self, items: Dict[str, str]):
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
@@ -0,0 +1,99 @@
+"""
+Segment Index
+Hierarchical benchmark lookup with fallback to broader segments
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+
+class SegmentIndex:
+    """
+    Trie of benchmarks over an ordered list of segment dimensions
+
+    With dimensions ('role', 'department', 'level'), a metric's global
+    benchmark sits at the root, a role benchmark one level down, a
+    role + department benchmark below that, and so on. Resolving a segment
+    walks down the trie along the segment's values and keeps the deepest
+    benchmark with enough samples, so a lookup costs one step per dimension
+    and falls back role + department + level -> role + department -> role
+    -> global.
+
+    Segments that are not a prefix of the dimensions (e.g. department
+    without role) are not indexed; they are still found by exact key.
+    """
+
+    def __init__(self, dimensions: Sequence[str] = ('role', 'department', 'level')):
+        """
+        Initialize segment index
+
+        Args:
+            dimensions: Segment dimensions, broadest first
+        """
+        self.dimensions = tuple(dimensions)
+        self._roots = {}
+
+    def add(self, benchmark: Dict) -> bool:
+        """
+        Index a benchmark under its metric and segment
+
+        Returns:
+            True if the segment fits the dimension hierarchy
+        """
+        segment = benchmark.get('segment') or {}
+        depth = len(segment)
+        if set(segment) != set(self.dimensions[:depth]):
+            return False
+
+        node = self._roots.setdefault(benchmark['metric_name'], _Node())
+        for dimension in self.dimensions[:depth]:
+            node = node.children.setdefault(_segment_value(segment[dimension]), _Node())
+        node.benchmark = benchmark
+        return True
+
+    def resolve(
+        self,
+        metric_name: str,
+        segment: Optional[Dict] = None,
+        min_sample_size: int = 1
+    ) -> Tuple[Optional[Dict], Optional[Tuple[str, ...]]]:
+        """
+        Find the most specific benchmark for a segment
+
+        Args:
+            metric_name: Metric to look up
+            segment: Segment values; dimensions outside the hierarchy are
+                ignored, and the walk stops at the first missing dimension
+            min_sample_size: Benchmarks with fewer samples are passed over
+
+        Returns:
+            (benchmark, dimensions it is segmented by), or (None, None) if
+            no level of the hierarchy has a usable benchmark
+        """
+        segment = segment or {}
+        node = self._roots.get(metric_name)
+        found, level = None, None
+
+        for depth in range(len(self.dimensions) + 1):
+            if node is None:
+                break
+            if node.benchmark is not None and node.benchmark['sample_size'] >= min_sample_size:
+                found, level = node.benchmark, self.dimensions[:depth]
+            if depth == len(self.dimensions) or self.dimensions[depth] not in segment:
+                break
+            node = node.children.get(_segment_value(segment[self.dimensions[depth]]))
+
+        return found, level
+
+
+class _Node:
+    __slots__ = ('benchmark', 'children')
+
+    def __init__(self):
+        self.benchmark = None
+        self.children = {}
+
+
+def _segment_value(value) -> str:
+    # Match benchmark keys, which format values as strings, so 3 and "3"
+    # (e.g. a level from JSON) resolve to the same segment
+    return str(value)
@@ -3,42 +3,90 @@ Sentiment Analysis Model
 NLP-based sentiment analysis for work communications
 """
 
+import copy
 import numpy as np
-from typing import Dict, List, Tuple
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from typing import Dict, FrozenSet, List, Tuple
+from transformers import AutoTokenizer
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import torch
 
+from models.batching import plan_token_batches
+from models.inference_backends import load_sequence_classifier
+from models.result_cache import ResultCache
+
 class SentimentAnalyzer:
     """
     Multi-model sentiment analyzer combining VADER and transformer-based models
     """
 
-    def __init__(self, model_name: str = "distilbert-base-uncased-finetuned-sst-2-english"):
+    # Common work-related topics
+    TOPIC_KEYWORDS = {
+        "deadline": ["deadline", "due", "urgent", "asap"],
+        "meeting": ["meeting", "call", "discussion", "sync"],
+        "project": ["project", "milestone", "deliverable"],
+        "feedback": ["feedback", "review", "comments"],
+        "approval": ["approve", "approval", "sign-off"],
+        "issue": ["issue", "problem", "bug", "error"],
+        "help": ["help", "support", "assist"]
+    }
+
+    def __init__(
+        self,
+        model_name: str = "distilbert-base-uncased-finetuned-sst-2-english",
+        batch_size: int = 32,
+        max_batch_tokens: int = 8192,
+        backend: str = "torch",
+        onnx_cache_dir: str = None,
+        emotion_model_name: str = "j-hartmann/emotion-english-distilroberta-base",
+        cache_size: int = 10000,
+        cache_ttl_seconds: float = 3600,
+        cache_redis_url: str = None,
+        num_threads: int = None
+    ):
         """
         Initialize sentiment analyzer with pre-trained models
 
         Args:
             model_name: HuggingFace model name for transformer-based analysis
+            batch_size: Maximum number of texts per forward pass
+            max_batch_tokens: Maximum padded tokens per forward pass
+            backend: Inference backend (torch, onnx, onnx_int8)
+            onnx_cache_dir: Directory for exported ONNX artifacts
+            emotion_model_name: HuggingFace model name for emotion detection
+            cache_size: Entries in the in-process result cache (0 disables it)
+            cache_ttl_seconds: Time-to-live for cached results
+            cache_redis_url: Redis URL for a result cache shared across workers
+            num_threads: Intra-op threads for ONNX Runtime sessions
         """
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.backend = backend
+
         # VADER for quick lexicon-based analysis
         self.vader = SentimentIntensityAnalyzer()
 
         # Transformer model for deep semantic analysis
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = "cuda" if backend == "torch" and torch.cuda.is_available() else "cpu"
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        self.model.to(self.device)
-        self.model.eval()
+        self.model = load_sequence_classifier(model_name, backend, self.device, onnx_cache_dir, num_threads)
 
         # Emotion detection model
-        self.emotion_model = pipeline(
-            "text-classification",
-            model="j-hartmann/emotion-english-distilroberta-base",
-            device=0 if self.device == "cuda" else -1,
-            top_k=None
+        self.emotion_tokenizer = AutoTokenizer.from_pretrained(emotion_model_name)
+        self.emotion_model = load_sequence_classifier(
+            emotion_model_name, backend, self.device, onnx_cache_dir, num_threads
         )
 
+        # Result cache keyed by normalized text; the namespace carries the
+        # model identifiers so switching models never serves stale results
+        self.cache = None
+        if cache_size > 0 or cache_redis_url:
+            self.cache = ResultCache(
+                namespace=f"sentiment|{model_name}|{emotion_model_name}|{backend}",
+                max_entries=cache_size,
+                ttl_seconds=cache_ttl_seconds,
+                redis_url=cache_redis_url
+            )
+
     def analyze(self, text: str) -> Dict:
         """
         Perform comprehensive sentiment analysis
@@ -49,37 +97,83 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment scores, labels, emotions, and metadata
         """
-        # VADER analysis
-        vader_scores = self.vader.polarity_scores(text)
+        return self.batch_analyze([text])[0]
+
+    def _normalize(self, text: str) -> str:
+        """Collapse whitespace so equivalent texts share one cache key"""
+        return " ".join(text.split())
+
+    def _prepare(self, texts: List[str]) -> List[Dict]:
+        """
+        Preprocess texts once for every downstream analysis
+
+        Each record holds the text (used by VADER, which relies on original
+        casing), its lowercase form and word set (used by topic and intent
+        rules) and the token encodings for the sentiment and emotion models.
+        Both tokenizers run once over the whole list.
 
-        # Transformer-based analysis
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-            padding=True
-        ).to(self.device)
+        Returns:
+            List of per-text preprocessing records
+        """
+        sentiment_encodings = self.tokenizer(texts, truncation=True, max_length=512)
+        emotion_encodings = self.emotion_tokenizer(texts, truncation=True, max_length=512)
+
+        records = []
+        for i, text in enumerate(texts):
+            lower = text.lower()
+            records.append({
+                'text': text,
+                'lower': lower,
+                'words': frozenset(lower.split()),
+                'sentiment_encoding': {key: sentiment_encodings[key][i] for key in sentiment_encodings.keys()},
+                'emotion_encoding': {key: emotion_encodings[key][i] for key in emotion_encodings.keys()}
+            })
+
+        return records
+
+    def _predict_proba(self, tokenizer, classifier, encodings: List[Dict], batch_size: int) -> np.ndarray:
+        """
+        Run a sequence classification model over pre-tokenized texts
+
+        Encodings are grouped into batches of similar length under the token
+        budget, padded per batch and the probabilities scattered back into
+        input order.
+
+        Returns:
+            Array of shape (len(encodings), num_labels) with class probabilities
+        """
+        lengths = [len(encoding["input_ids"]) for encoding in encodings]
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        probs = None
+        for batch in plan_token_batches(lengths, self.max_batch_tokens, batch_size):
+            inputs = tokenizer.pad([encodings[i] for i in batch], return_tensors="np")
+            batch_probs = classifier.predict_proba(dict(inputs))
+
+            if probs is None:
+                probs = np.empty((len(encodings), batch_probs.shape[1]), dtype=batch_probs.dtype)
+            probs[batch] = batch_probs
+
+        return probs
+
+    def _build_result(self, record: Dict, probs: np.ndarray, emotions: Dict) -> Dict:
+        """
+        Combine model outputs for a single text into the analysis result
+        """
+        # VADER analysis
+        vader_scores = self.vader.polarity_scores(record['text'])
 
         # Get sentiment from transformer (assuming binary classification)
-        transformer_score = probs[0][1].item() - probs[0][0].item()  # positive - negative
-        confidence = max(probs[0]).item()
+        transformer_score = float(probs[1] - probs[0])  # positive - negative
+        confidence = float(max(probs))
 
         # Combine scores (weighted average)
         combined_score = (vader_scores['compound'] * 0.3 + transformer_score * 0.7)
 
-        # Emotion detection
-        emotions = self._detect_emotions(text)
-
         # Topic extraction
-        topics = self._extract_topics(text)
+        topics = self._extract_topics(record['words'])
 
         # Intent classification
-        intent = self._classify_intent(text)
+        intent = self._classify_intent(record['lower'])
 
         # Determine sentiment label
         sentiment_label = self._get_sentiment_label(combined_score)
@@ -96,7 +190,7 @@ class SentimentAnalyzer:
             "transformer_confidence": round(confidence, 2)
         }
 
-    def _detect_emotions(self, text: str) -> Dict:
+    def _detect_emotions(self, record: Dict) -> Dict:
         """
         Detect emotions in text using emotion classification model
 
@@ -104,60 +198,78 @@ class SentimentAnalyzer:
             Dictionary with emotion scores and dominant emotion
         """
         try:
-            emotion_results = self.emotion_model(text)[0]
-
-            emotions = {}
-            for result in emotion_results:
-                emotions[result['label']] = round(result['score'], 3)
+            probs = self._predict_proba(
+                self.emotion_tokenizer, self.emotion_model, [record['emotion_encoding']], 1
+            )
+            return self._format_emotions(probs[0])
+        except Exception as e:
+            return {"dominant": "neutral", "dominant_score": 0.5}
 
-            # Find dominant emotion
-            dominant = max(emotions.items(), key=lambda x: x[1])
+    def _detect_emotions_batch(self, records: List[Dict], batch_size: int) -> List[Dict]:
+        """
+        Detect emotions for many texts with length-bucketed batches
 
-            return {
-                **emotions,
-                "dominant": dominant[0],
-                "dominant_score": dominant[1]
-            }
+        Falls back to per-text detection if the batched call fails, so a
+        single bad input only degrades its own result.
+        """
+        try:
+            probs = self._predict_proba(
+                self.emotion_tokenizer,
+                self.emotion_model,
+                [record['emotion_encoding'] for record in records],
+                batch_size
+            )
+            return [self._format_emotions(row) for row in probs]
         except Exception as e:
-            return {"dominant": "neutral", "dominant_score": 0.5}
+            return [self._detect_emotions(record) for record in records]
 
-    def _extract_topics(self, text: str) -> List[str]:
+    def _format_emotions(self, probs: np.ndarray) -> Dict:
+        """
+        Convert emotion class probabilities into scores and dominant emotion
+        """
+        labels = self.emotion_model.labels
+
+        emotions = {}
+        for i in np.argsort(-probs, kind="stable"):
+            emotions[labels[int(i)]] = round(float(probs[i]), 3)
+
+        # Find dominant emotion
+        dominant = max(emotions.items(), key=lambda x: x[1])
+
+        return {
+            **emotions,
+            "dominant": dominant[0],
+            "dominant_score": dominant[1]
+        }
+
+    def _extract_topics(self, words: FrozenSet[str]) -> List[str]:
         """
         Extract main topics from text using keyword extraction
 
+        Args:
+            words: Set of lowercase words in the text
+
         Returns:
             List of topic keywords
         """
         # Simple keyword extraction (can be enhanced with more sophisticated methods)
-        words = text.lower().split()
-
-        # Common work-related topics
-        topic_keywords = {
-            "deadline": ["deadline", "due", "urgent", "asap"],
-            "meeting": ["meeting", "call", "discussion", "sync"],
-            "project": ["project", "milestone", "deliverable"],
-            "feedback": ["feedback", "review", "comments"],
-            "approval": ["approve", "approval", "sign-off"],
-            "issue": ["issue", "problem", "bug", "error"],
-            "help": ["help", "support", "assist"]
-        }
-
         detected_topics = []
-        for topic, keywords in topic_keywords.items():
+        for topic, keywords in self.TOPIC_KEYWORDS.items():
             if any(keyword in words for keyword in keywords):
                 detected_topics.append(topic)
 
         return detected_topics[:5]  # Return top 5 topics
 
-    def _classify_intent(self, text: str) -> str:
+    def _classify_intent(self, text_lower: str) -> str:
         """
         Classify the intent of the communication
 
+        Args:
+            text_lower: Lowercased text
+
         Returns:
             Intent classification
         """
-        text_lower = text.lower()
-
         # Simple rule-based intent classification
         if any(word in text_lower for word in ["?", "how", "what", "when", "where", "why"]):
             return "QUESTION"
@@ -193,17 +305,82 @@ class SentimentAnalyzer:
         else:
             return "VERY_POSITIVE"
 
-    def batch_analyze(self, texts: List[str]) -> List[Dict]:
+    def cache_stats(self) -> Dict:
+        """Get result cache counters, or None when caching is disabled"""
+        return self.cache.stats() if self.cache is not None else None
+
+    def batch_analyze(self, texts: List[str], batch_size: int = None) -> List[Dict]:
         """
         Analyze multiple texts in batch for efficiency
 
+        Texts repeated up to whitespace are analyzed once (as first given)
+        and previously seen texts are served from the result cache; every
+        position gets its own result object. The rest are bucketed by token
+        length and run through the sentiment and emotion models in batches
+        under a token budget; per-text results match analyze() and are
+        returned in input order.
+
         Args:
             texts: List of texts to analyze
+            batch_size: Maximum texts per forward pass (defaults to self.batch_size)
 
         Returns:
             List of sentiment analysis results
         """
-        results = []
-        for text in texts:
-            results.append(self.analyze(text))
-        return results
+        if not texts:
+            return []
+
+        batch_size = batch_size or self.batch_size
+
+        normalized = [self._normalize(text) for text in texts]
+
+        if self.cache is not None:
+            keys = [self.cache.make_key(text) for text in normalized]
+            results = self.cache.get_many(keys)
+        else:
+            keys = normalized
+            results = {}
+
+        # Texts differing only in whitespace share a key; the first one is
+        # analyzed as given, since the models and rules see the raw text
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in results:
+                pending.setdefault(key, text)
+
+        if pending:
+            computed = dict(zip(pending.keys(), self._analyze_uncached(list(pending.values()), batch_size)))
+            if self.cache is not None:
+                self.cache.set_many(computed)
+            results.update(computed)
+
+        # Duplicates share one analysis but not one dict, so mutating a
+        # result never changes another position
+        output = []
+        seen = set()
+        for key in keys:
+            output.append(copy.deepcopy(results[key]) if key in seen else results[key])
+            seen.add(key)
+        return output
+
+    def _analyze_uncached(self, texts: List[str], batch_size: int) -> List[Dict]:
+        """
+        Run the full analysis over unique texts
+
+        Returns:
+            List of sentiment analysis results in input order
+        """
+        records = self._prepare(texts)
+
+        sentiment_probs = self._predict_proba(
+            self.tokenizer,
+            self.model,
+            [record['sentiment_encoding'] for record in records],
+            batch_size
+        )
+        emotions = self._detect_emotions_batch(records, batch_size)
+
+        return [
+            self._build_result(record, probs, text_emotions)
+            for record, probs, text_emotions in zip(records, sentiment_probs, emotions)
+        ]
@@ -0,0 +1,251 @@
+"""
+Compiled Tree-Ensemble Inference
+Flat array-backed evaluation of fitted sklearn tree ensembles with NumPy
+"""
+
+import numpy as np
+from typing import Dict
+from sklearn.ensemble import (
+    GradientBoostingRegressor,
+    IsolationForest,
+    RandomForestRegressor
+)
+from sklearn.ensemble._iforest import _average_path_length
+
+
+class CompiledTreeEnsemble:
+    """
+    Tree ensemble converted to flat node tables
+
+    All trees are concatenated into single feature/threshold/children/value
+    arrays, with leaves pointing back at themselves so every row can step
+    through all trees in lockstep for max_depth vectorized iterations.
+    Tables are stored in the dtypes inference reads them in (int32 indices),
+    so loading a memory-mapped engine copies nothing. Supports
+    RandomForestRegressor, GradientBoostingRegressor and IsolationForest.
+    """
+
+    ARRAY_FIELDS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+    def __init__(
+        self,
+        kind: str,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        params: Dict = None
+    ):
+        """
+        Initialize from node tables (use from_sklearn to compile a model)
+
+        Args:
+            kind: random_forest, gradient_boosting or isolation_forest
+            feature: Split feature per node (0 for leaves), int32
+            threshold: Split threshold per node
+            children: Interleaved (right, left) child per node (self for
+                leaves), int32, so one take() picks the branch from the
+                comparison result
+            value: Leaf output per node
+            roots: Root node index of each tree, int32
+            max_depth: Depth of the deepest tree
+            params: Model-specific constants (baseline, learning rate, offset)
+        """
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.params = params or {}
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledTreeEnsemble":
+        """
+        Compile a fitted sklearn ensemble
+
+        Raises:
+            ValueError: If the model type or configuration is unsupported
+        """
+        if isinstance(model, RandomForestRegressor):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            feature_maps = [None] * len(trees)
+            kind = 'random_forest'
+            params = {}
+        elif isinstance(model, GradientBoostingRegressor):
+            trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+            feature_maps = [None] * len(trees)
+            kind = 'gradient_boosting'
+            if model.init_ == 'zero':
+                baseline = 0.0
+            elif hasattr(model.init_, 'constant_'):
+                baseline = float(np.ravel(model.init_.constant_)[0])
+            else:
+                raise ValueError("Only constant or zero init estimators can be compiled")
+            params = {'baseline': baseline, 'learning_rate': float(model.learning_rate)}
+        elif isinstance(model, IsolationForest):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            # Trees fitted on a feature subset index into that subset
+            if model._max_features != model.n_features_in_:
+                feature_maps = [np.asarray(f) for f in model.estimators_features_]
+            else:
+                feature_maps = [None] * len(trees)
+            kind = 'isolation_forest'
+            params = {
+                'offset': float(model.offset_),
+                'normalizer': float(len(trees) * _average_path_length([model._max_samples])[0])
+            }
+        else:
+            raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for tree, feature_map in zip(trees, feature_maps):
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n)
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            if feature_map is not None:
+                feature = np.where(is_leaf, 0, feature_map[np.maximum(tree.feature, 0)])
+
+            depth = cls._node_depths(tree)
+            max_depth = max(max_depth, int(depth.max()))
+
+            if kind == 'isolation_forest':
+                # Path length of a leaf: its depth plus the expected depth of
+                # the unbuilt subtree for the samples that reached it
+                value = depth + _average_path_length(tree.n_node_samples)
+            else:
+                value = tree.value[:, 0, 0]
+
+            tree_children = np.empty(2 * n, dtype=np.int32)
+            tree_children[0::2] = np.where(is_leaf, own, tree.children_right + offset)
+            tree_children[1::2] = np.where(is_leaf, own, tree.children_left + offset)
+
+            features.append(feature.astype(np.int32))
+            thresholds.append(np.asarray(tree.threshold, dtype=np.float64))
+            children.append(tree_children)
+            values.append(np.asarray(value, dtype=np.float64))
+            roots.append(offset)
+            offset += n
+
+        return cls(
+            kind,
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.concatenate(children),
+            np.concatenate(values),
+            np.asarray(roots, dtype=np.int32),
+            max_depth,
+            params
+        )
+
+    @staticmethod
+    def _node_depths(tree) -> np.ndarray:
+        depth = np.zeros(tree.node_count, dtype=np.float64)
+        for node in range(tree.node_count):
+            # Children always have larger indices than their parent
+            left = tree.children_left[node]
+            if left != -1:
+                depth[left] = depth[node] + 1
+                depth[tree.children_right[node]] = depth[node] + 1
+        return depth
+
+    def leaf_values(self, X: np.ndarray, chunk_size: int = 1024) -> np.ndarray:
+        """
+        Evaluate every tree on every row
+
+        Inputs are rounded to float32 before comparison, matching sklearn.
+
+        Returns:
+            Array of shape (n_rows, n_trees) with each tree's leaf value
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        output = np.empty((n_rows, n_trees), dtype=np.float64)
+
+        for start in range(0, n_rows, chunk_size):
+            chunk = np.ascontiguousarray(X[start:start + chunk_size])
+            flat = chunk.ravel()
+            row_offsets = (np.arange(chunk.shape[0], dtype=np.int64) * n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (chunk.shape[0], n_trees))
+
+            for _ in range(self.max_depth):
+                go_left = np.take(flat, row_offsets + np.take(self.feature, nodes)) <= np.take(self.threshold, nodes)
+                nodes = np.take(self.children, 2 * nodes + go_left)
+
+            output[start:start + chunk.shape[0]] = np.take(self.value, nodes)
+
+        return output
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """Isolation forest score (same convention as sklearn; lower is more abnormal)"""
+        if self.kind != 'isolation_forest':
+            raise ValueError("score_samples is only available for isolation forests")
+
+        path_lengths = self.leaf_values(X).sum(axis=1)
+        return -(2 ** (-path_lengths / self.params['normalizer']))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Isolation forest decision function (negative means anomaly)"""
+        return self.score_samples(X) - self.params['offset']
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict like the source model
+
+        Returns:
+            Regression outputs, or -1/1 outlier labels for isolation forests
+        """
+        if self.kind == 'random_forest':
+            return self.leaf_values(X).mean(axis=1)
+        elif self.kind == 'gradient_boosting':
+            return self.params['baseline'] + self.params['learning_rate'] * self.leaf_values(X).sum(axis=1)
+
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+    def validate(self, model, X: np.ndarray, atol: float = 1e-6) -> float:
+        """
+        Check compiled outputs against the sklearn model
+
+        Returns:
+            Maximum absolute difference
+
+        Raises:
+            ValueError: If any output differs by more than atol
+        """
+        if self.kind == 'isolation_forest':
+            expected, actual = model.score_samples(X), self.score_samples(X)
+        else:
+            expected, actual = model.predict(X), self.predict(X)
+
+        max_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+        if max_diff > atol:
+            raise ValueError(f"Compiled ensemble deviates from sklearn by {max_diff:.3g}")
+        return max_diff
+
+    def to_dict(self) -> Dict:
+        """Serialize to plain arrays (memory-mappable with joblib)"""
+        return {
+            'kind': self.kind,
+            'max_depth': self.max_depth,
+            'params': self.params,
+            **{name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompiledTreeEnsemble":
+        """Restore from to_dict output (arrays are used as stored)"""
+        return cls(
+            data['kind'],
+            *[data[name] for name in cls.ARRAY_FIELDS],
+            max_depth=data['max_depth'],
+            params=data['params']
+        )
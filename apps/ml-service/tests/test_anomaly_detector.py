@@ -0,0 +1,138 @@
+"""Anomaly detector scoring"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyod")
+
+from models.anomaly_detector import AnomalyDetector
+
+METHODS = [
+    ("isolation_forest", {}),
+    ("isolation_forest", {"use_compiled_engine": True}),
+    ("lof", {}),
+    ("lof", {"neighbor_index": "exact"}),
+    ("knn", {}),
+    ("knn", {"neighbor_index": "exact"}),
+]
+
+
+@pytest.fixture(scope="module")
+def population():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        name: rng.normal(10, 2, 400)
+        for name in AnomalyDetector.FEATURE_SCHEMA.names
+    })
+    # A handful of clear outliers so both labels occur
+    data.iloc[:8] *= 4
+    return data
+
+
+@pytest.mark.parametrize("method,options", METHODS, ids=lambda value: str(value))
+def test_single_pass_matches_model(method, options, population):
+    detector = AnomalyDetector(method=method, **options)
+    detector.fit(population)
+    X_scaled = detector.scaler.transform(population.to_numpy())
+
+    scores, labels = detector._score_batch(X_scaled)
+
+    model = detector.model
+    if method == "isolation_forest":
+        # Anomaly score is the negated sklearn score: -(decision_function + offset_)
+        np.testing.assert_allclose(scores, -(model.decision_function(X_scaled) + model.offset_), atol=1e-9)
+        np.testing.assert_array_equal(labels, model.predict(X_scaled) == -1)
+    else:
+        np.testing.assert_allclose(scores, model.decision_function(X_scaled), atol=1e-9)
+        np.testing.assert_array_equal(labels, model.predict(X_scaled) == 1)
+
+    assert labels.any() and not labels.all()
+
+
+def _entity_records(n, seed=5):
+    """Metrics spread across the anomaly type rule thresholds"""
+    rng = np.random.default_rng(seed)
+    ranges = {
+        'productivity_score': (10, 90),
+        'engagement_score': (10, 90),
+        'sentiment_score': (-1, 1),
+        'hours_worked': (30, 70),
+        'tasks_completed': (0, 20),
+        'meeting_hours': (0, 40),
+        'avg_response_time_hours': (0, 48),
+        'collaboration_score': (10, 90),
+        'code_quality_score': (30, 100),
+        'bug_rate': (0, 0.3),
+        'meeting_attendance_rate': (0, 1),
+        'productivity_trend_30d': (-30, 10),
+        'communication_frequency': (0, 40),
+        'sentiment_trend_30d': (-1, 0.5),
+    }
+    # Each entity reports a random subset, so schema defaults are exercised
+    return [
+        {name: float(rng.uniform(low, high)) for name, (low, high) in ranges.items() if rng.random() < 0.85}
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.parametrize("method,options", METHODS, ids=lambda value: str(value))
+def test_batch_detection_matches_single_detection(method, options):
+    records = _entity_records(240)
+    detector = AnomalyDetector(method=method, **options)
+    detector.fit(pd.DataFrame(detector.FEATURE_SCHEMA.build(records[:200]), columns=detector.FEATURE_SCHEMA.names))
+
+    expected = [detector.detect(record) for record in records]
+    names = {name for record in records for name in record}
+    columns = {name: [record.get(name) for record in records] for name in names}
+
+    assert detector.detect_batch(records) == expected
+    assert detector.detect_batch(columns) == expected
+    assert {t for result in expected for t in result['anomaly_types']} >= set(AnomalyDetector.ANOMALY_TYPES)
+
+
+@pytest.mark.parametrize("method", ["lof", "knn"])
+@pytest.mark.parametrize("metric,p", [("minkowski", 1), ("chebyshev", 2), ("minkowski", 3)])
+def test_neighbor_index_uses_detector_metric(method, metric, p, population):
+    detector = AnomalyDetector(method=method, neighbor_index="exact")
+    # pyod KNN builds its neighbor search in __init__, so set the metric there
+    detector.model = type(detector.model)(metric=metric, p=p)
+    detector.fit(population)
+    X_scaled = detector.scaler.transform(population.to_numpy())
+
+    assert detector.neighbor_scorer is not None
+    np.testing.assert_allclose(
+        detector.neighbor_scorer.decision_function(X_scaled),
+        detector.model.decision_function(X_scaled),
+        atol=1e-9
+    )
+
+
+def test_approximate_index_falls_back_for_other_metrics(population):
+    detector = AnomalyDetector(method="knn", neighbor_index="approximate")
+    detector.model = type(detector.model)(metric="manhattan")
+    detector.fit(population)
+
+    assert detector.neighbor_scorer is None
+    assert "euclidean" in detector.neighbor_report["fallback"]
+
+
+def test_unknown_neighbor_index_mode_is_rejected():
+    with pytest.raises(ValueError, match="exakt"):
+        AnomalyDetector(method="knn", neighbor_index="exakt")
+
+
+def test_refit_after_loading_an_engine(population, tmp_path):
+    trained = AnomalyDetector(use_compiled_engine=True)
+    trained.fit(population)
+    path = str(tmp_path / "anomaly.joblib")
+    trained.save_model(path)
+
+    served = AnomalyDetector(use_compiled_engine=True)
+    served.load_model(path)
+    assert served.model is None
+
+    served.fit(population)
+    records = population.head(20).to_dict("records")
+    assert served.model is not None
+    assert served.detect_batch(records) == trained.detect_batch(records)
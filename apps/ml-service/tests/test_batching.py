@@ -0,0 +1,55 @@
+"""Token-budget batch planning"""
+
+import numpy as np
+import pytest
+
+from models.batching import plan_token_batches
+
+
+@pytest.fixture(scope="module")
+def lengths():
+    return np.random.default_rng(3).integers(1, 300, 500).tolist()
+
+
+def test_batches_stay_within_budget(lengths):
+    batches = plan_token_batches(lengths, max_batch_tokens=2048, max_batch_size=64)
+
+    for batch in batches:
+        assert len(batch) * max(lengths[i] for i in batch) <= 2048
+
+
+def test_batch_size_is_capped():
+    batches = plan_token_batches([5] * 100, max_batch_tokens=10**6, max_batch_size=16)
+
+    assert [len(batch) for batch in batches] == [16] * 6 + [4]
+
+
+def test_oversized_item_gets_its_own_batch():
+    batches = plan_token_batches([10, 5000, 12, 8], max_batch_tokens=1000)
+
+    assert [1] in batches
+    assert sorted(i for batch in batches for i in batch) == [0, 1, 2, 3]
+
+
+def test_batches_group_similar_lengths(lengths):
+    batches = plan_token_batches(lengths, max_batch_tokens=2048, max_batch_size=64)
+    ordered = [lengths[i] for batch in batches for i in batch]
+
+    assert ordered == sorted(lengths)
+
+
+def test_results_scatter_back_to_input_order(lengths):
+    texts = [f"text-{i}" for i in range(len(lengths))]
+    batches = plan_token_batches(lengths, max_batch_tokens=2048, max_batch_size=64)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+    results = [None] * len(texts)
+    for batch in batches:
+        for i, result in zip(batch, [texts[i].upper() for i in batch]):
+            results[i] = result
+
+    assert results == [text.upper() for text in texts]
+
+
+def test_empty_input():
+    assert plan_token_batches([]) == []
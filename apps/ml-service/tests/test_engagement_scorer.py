@@ -0,0 +1,93 @@
+"""Vectorized engagement scoring"""
+
+import numpy as np
+import pytest
+
+from models.engagement_scorer import EngagementScorer
+
+# Value ranges wide enough to reach every level, trend and risk branch
+RANGES = {
+    'meetings_attended': (0, 20),
+    'total_meetings': (1, 20),
+    'meeting_participation_rate': (0, 1),
+    'forum_posts': (0, 15),
+    'events_attended': (0, 5),
+    'surveys_completed': (0, 4),
+    'total_surveys': (1, 4),
+    'messages_sent': (0, 150),
+    'expected_messages_per_week': (20, 80),
+    'responses_to_mentions': (0, 30),
+    'total_mentions': (1, 30),
+    'communication_clarity': (0, 1),
+    'reactions_given': (0, 60),
+    'code_reviews_given': (0, 15),
+    'pair_programming_sessions': (0, 8),
+    'knowledge_contributions': (0, 6),
+    'cross_team_collaborations': (0, 6),
+    'mentoring_sessions': (0, 5),
+    'self_initiated_tasks': (0, 8),
+    'improvements_suggested': (0, 5),
+    'voluntary_contributions': (0, 5),
+    'proactive_problem_solving': (0, 5),
+    'learning_activities': (0, 6),
+    'avg_response_time_hours': (0, 60),
+    'response_rate': (0, 1),
+    'availability_percentage': (0, 1),
+    'acknowledgment_rate': (0, 1),
+    'activity_variance': (0, 0.6),
+    'current_engagement_score': (0, 100),
+    'previous_engagement_score': (0, 100),
+    'week_ago_engagement_score': (0, 100),
+    'engagement_trend': (-30, 10),
+    'avg_daily_activities': (0, 40),
+    'consistency_score': (0, 100),
+    'total_activities': (0, 400),
+    'active_days': (0, 7),
+    'synchronous_engagement_pct': (0, 100),
+    'asynchronous_engagement_pct': (0, 100),
+}
+
+
+@pytest.fixture(scope="module")
+def records():
+    rng = np.random.default_rng(11)
+    records = []
+    for _ in range(300):
+        # Each user reports a random subset, so defaults are exercised too
+        record = {
+            name: float(rng.uniform(low, high))
+            for name, (low, high) in RANGES.items()
+            if rng.random() < 0.8
+        }
+        if rng.random() < 0.5:
+            record['hourly_activity_distribution'] = {str(h): int(rng.integers(0, 20)) for h in range(9, 18)}
+        if rng.random() < 0.5:
+            record['daily_activity_distribution'] = {day: int(rng.integers(0, 20)) for day in ('Mon', 'Tue', 'Wed')}
+        records.append(record)
+    return records
+
+
+def _columns(records):
+    names = sorted({name for record in records for name in record})
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def test_batch_scores_match_per_user_scores(records):
+    scorer = EngagementScorer()
+    expected = [scorer.calculate_score(record) for record in records]
+
+    assert scorer.calculate_scores(records) == expected
+    assert scorer.calculate_scores(_columns(records)) == expected
+
+
+def test_score_columns_match_per_user_scores(records):
+    scorer = EngagementScorer()
+    expected = [scorer.calculate_score(record) for record in records]
+    columns = scorer.calculate_score_columns(_columns(records))
+
+    for field, values in columns.items():
+        if field == 'component_scores':
+            for component, component_values in values.items():
+                assert component_values == [result[field][component] for result in expected]
+        else:
+            assert values == [result[field] for result in expected], field
@@ -0,0 +1,58 @@
+"""Engagement state persistence"""
+
+import multiprocessing
+
+import pytest
+
+from models.engagement_scorer import EngagementScorer
+from models.engagement_state import EngagementStateStore
+
+UPDATES_PER_WORKER = 25
+WORKERS = 4
+
+
+def _update_many(db_path: str):
+    scorer = EngagementScorer(state_store=EngagementStateStore(db_path=db_path))
+    for _ in range(UPDATES_PER_WORKER):
+        scorer.update("user-1", [{"messages_sent": 1}], timestamp=1_700_000_000)
+
+
+def test_concurrent_processes_keep_every_event(tmp_path):
+    db_path = str(tmp_path / "engagement.db")
+    EngagementStateStore(db_path=db_path).get("user-1")
+
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_update_many, args=(db_path,)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    state = EngagementStateStore(db_path=db_path).get("user-1")
+    assert sum(bucket["messages_sent"] for bucket in state["buckets"].values()) == WORKERS * UPDATES_PER_WORKER
+    assert len(state["scores"]) == min(WORKERS * UPDATES_PER_WORKER, 32)
+
+
+def test_failed_update_leaves_state_unchanged():
+    store = EngagementStateStore()
+    EngagementScorer(state_store=store).update("user-1", [{"messages_sent": 3}], timestamp=1_700_000_000)
+
+    with pytest.raises(RuntimeError):
+        with store.transaction("user-1") as state:
+            store.apply_events(state, [{"messages_sent": 5}], 1_700_000_000)
+            raise RuntimeError("scoring failed")
+
+    buckets = store.get("user-1")["buckets"]
+    assert sum(bucket["messages_sent"] for bucket in buckets.values()) == 3
+
+
+def test_in_memory_store_evicts_least_recent_users():
+    store = EngagementStateStore(max_users=2)
+    scorer = EngagementScorer(state_store=store)
+    for user_id in ("a", "b", "a", "c"):
+        scorer.update(user_id, [{"messages_sent": 1}], timestamp=1_700_000_000)
+
+    assert store.get("b")["scores"] == []
+    assert len(store.get("a")["scores"]) == 2
+    assert len(store.get("c")["scores"]) == 1
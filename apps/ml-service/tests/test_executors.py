@@ -0,0 +1,87 @@
+"""Per-family model executors"""
+
+import asyncio
+import os
+from functools import partial
+
+import pytest
+
+from api import executors as executors_module
+from api.executors import ModelExecutors
+
+
+class _Model:
+    pass
+
+
+def _load_model():
+    return _Model()
+
+
+def _record_worker(directory, model):
+    with open(os.path.join(directory, str(os.getpid())), "w"):
+        pass
+
+
+def _warm_up(executors, family, directory):
+    async def run():
+        try:
+            return await executors.warm_up(family, partial(_record_worker, directory))
+        finally:
+            executors.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_process_pool_warms_up_every_worker(tmp_path):
+    executors = ModelExecutors(
+        {"anomaly": _load_model},
+        workers={"anomaly": 3},
+        process_families=("anomaly",),
+        intra_op_threads=os.cpu_count()
+    )
+    timings = _warm_up(executors, "anomaly", str(tmp_path))
+
+    assert len(os.listdir(tmp_path)) == 3
+    assert str(os.getpid()) not in os.listdir(tmp_path)
+    assert timings["load_seconds"] is not None
+    assert timings["warmup_seconds"] is not None
+
+
+def test_thread_pool_warms_up_shared_model_once(tmp_path):
+    executors = ModelExecutors(
+        {"anomaly": _load_model},
+        workers={"anomaly": 3},
+        intra_op_threads=os.cpu_count()
+    )
+    _warm_up(executors, "anomaly", str(tmp_path))
+
+    assert os.listdir(tmp_path) == [str(os.getpid())]
+
+
+def _fail_to_load():
+    raise RuntimeError("model artifact missing")
+
+
+def test_failed_worker_warm_up_reports_its_error(tmp_path):
+    executors = ModelExecutors(
+        {"anomaly": _fail_to_load},
+        workers={"anomaly": 2},
+        process_families=("anomaly",),
+        intra_op_threads=os.cpu_count()
+    )
+
+    with pytest.raises(RuntimeError, match="model artifact missing"):
+        _warm_up(executors, "anomaly", str(tmp_path))
+
+
+def test_default_intra_op_threads_split_between_intra_op_workers(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(executors_module, "configure_intra_op_threads", lambda num_threads: None)
+    factories = {family: _load_model for family in ("sentiment", "engagement", "benchmark")}
+
+    executors = ModelExecutors(factories, workers={"sentiment": 2, "engagement": 4, "benchmark": 4})
+    assert executors.intra_op_threads == 4
+
+    executors = ModelExecutors(factories, workers={"sentiment": 2}, process_families=("sentiment",))
+    assert executors.intra_op_threads == 8
@@ -0,0 +1,29 @@
+"""Feature schema matrix building"""
+
+import numpy as np
+import pytest
+
+from models.feature_schema import Feature, FeatureSchema
+
+SCHEMA = FeatureSchema([
+    Feature('hours', default=40),
+    Feature('weekend', source='day', default=1, transform=lambda day: day >= 6),
+])
+
+
+def test_records_and_columns_build_the_same_matrix():
+    records = [{'hours': 35, 'day': 7}, {'hours': None}, {}]
+    columns = {'hours': [35, None, np.nan], 'day': [7, None, None]}
+
+    expected = np.array([[35, 1], [40, 0], [40, 0]], dtype=np.float64)
+    np.testing.assert_array_equal(SCHEMA.build(records), expected)
+    np.testing.assert_array_equal(SCHEMA.build(columns), expected)
+
+
+def test_single_record_is_one_row():
+    np.testing.assert_array_equal(SCHEMA.build({'hours': 50}), [[50, 0]])
+
+
+@pytest.mark.parametrize("data", [{}, [], {'hours': []}], ids=["empty mapping", "no records", "empty columns"])
+def test_empty_input_has_no_rows(data):
+    assert SCHEMA.build(data).shape == (0, 2)
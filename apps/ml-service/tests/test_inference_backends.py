@@ -0,0 +1,69 @@
+"""Parity of exported ONNX backends with the PyTorch reference"""
+
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+transformers = pytest.importorskip("transformers")
+
+from models.inference_backends import check_parity, load_sequence_classifier
+
+MODEL_NAME = os.getenv(
+    "PARITY_TEST_MODEL",
+    "hf-internal-testing/tiny-random-DistilBertForSequenceClassification"
+)
+
+TEXTS = [
+    "Great work on the release, the whole team is thrilled.",
+    "The deadline slipped again and nobody flagged the blocker.",
+    "Can we sync tomorrow about the review comments?",
+    "ok",
+    "This bug has been open for weeks and it is blocking every deploy we try to ship to production.",
+]
+
+# Maximum absolute difference in class probabilities
+TOLERANCES = {
+    "onnx": 1e-4,
+    "onnx_int8": 5e-2,
+}
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    try:
+        return transformers.AutoTokenizer.from_pretrained(MODEL_NAME)
+    except OSError as e:
+        pytest.skip(f"model {MODEL_NAME} unavailable: {e}")
+
+
+@pytest.fixture(scope="module")
+def reference(tokenizer):
+    return load_sequence_classifier(MODEL_NAME, "torch")
+
+
+@pytest.mark.parametrize("backend", sorted(TOLERANCES))
+def test_onnx_matches_torch(tokenizer, reference, backend, tmp_path_factory):
+    candidate = load_sequence_classifier(
+        MODEL_NAME,
+        backend,
+        cache_dir=str(tmp_path_factory.getbasetemp() / "onnx"),
+        num_threads=1
+    )
+
+    parity = check_parity(tokenizer, reference, candidate, TEXTS)
+
+    assert parity["samples"] == len(TEXTS)
+    assert parity["max_abs_diff"] <= TOLERANCES[backend]
+
+
+def test_onnx_session_uses_requested_threads(tokenizer, tmp_path_factory):
+    classifier = load_sequence_classifier(
+        MODEL_NAME,
+        "onnx",
+        cache_dir=str(tmp_path_factory.getbasetemp() / "onnx"),
+        num_threads=2
+    )
+
+    assert classifier.session.get_session_options().intra_op_num_threads == 2
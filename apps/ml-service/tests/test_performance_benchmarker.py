@@ -0,0 +1,127 @@
+"""Benchmark merging and incremental updates"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.performance_benchmarker import PerformanceBenchmarker
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({"score": rng.gamma(3, 10, 20000)})
+
+
+@pytest.mark.parametrize("distribution", ["summary", "sorted", "sketch"])
+def test_merged_shards_match_full_benchmark(scores, distribution):
+    full = PerformanceBenchmarker()
+    full.create_benchmark(scores, "score", distribution=distribution)
+
+    merged = PerformanceBenchmarker()
+    shards = []
+    for part in np.array_split(np.arange(len(scores)), 4):
+        shard = PerformanceBenchmarker()
+        shard.create_benchmark(scores.iloc[part], "score", distribution=distribution)
+        shards.append((shard, dict(shard.get_benchmark("score"))))
+        merged.merge(shard)
+
+    expected, actual = full.get_benchmark("score"), merged.get_benchmark("score")
+    assert actual["sample_size"] == expected["sample_size"]
+    for field in ("mean", "standard_deviation", "min_value", "max_value"):
+        assert actual[field] == pytest.approx(expected[field], rel=1e-9)
+    assert actual["percentile_50"] == pytest.approx(expected["percentile_50"], rel=0.02)
+
+    # Merging reads the shards without attaching statistics to them
+    for shard, before in shards:
+        assert shard._stats == {}
+        assert shard.get_benchmark("score").keys() == before.keys()
+
+
+def test_summary_benchmarks_stay_plain(scores):
+    benchmarker = PerformanceBenchmarker()
+    benchmarker.create_benchmark(scores.iloc[:10000], "score")
+    json.dumps(benchmarker.get_benchmark("score"))
+
+    benchmarker.update_benchmark("score", scores["score"].to_numpy()[10000:])
+    updated = benchmarker.get_benchmark("score")
+    json.dumps(updated)
+
+    assert updated["sample_size"] == len(scores)
+    assert updated["mean"] == pytest.approx(scores["score"].mean(), rel=1e-9)
+    assert updated["standard_deviation"] == pytest.approx(scores["score"].std(), rel=1e-9)
+
+
+@pytest.mark.parametrize("distribution", ["summary", "sorted", "sketch"])
+def test_batch_compare_matches_single_comparisons(distribution):
+    rng = np.random.default_rng(8)
+    history = pd.DataFrame({
+        "role": rng.choice(["dev", "qa", "pm"], 3000),
+        "level": rng.choice([1, 2], 3000),
+        "velocity": rng.gamma(4, 8, 3000),
+    })
+    benchmarker = PerformanceBenchmarker(min_sample_size=10)
+    benchmarker.create_benchmark(history, "velocity", distribution=distribution)
+    benchmarker.create_benchmarks(history[history["role"] != "pm"], ["velocity"], ["role"], distribution=distribution)
+    benchmarker.create_benchmarks(history[history["role"] == "dev"], ["velocity"], ["role", "level"], distribution=distribution)
+
+    users = pd.DataFrame({
+        "user_id": np.arange(400),
+        "role": rng.choice(["dev", "qa", "pm"], 400),
+        "level": rng.choice([1, 2], 400),
+        # Values beyond both ends of the benchmark range too
+        "velocity": rng.uniform(-10, 150, 400),
+    })
+    results = benchmarker.batch_compare(users, "velocity", ["role", "level"], include_insights=True)
+
+    assert results["user_id"].tolist() == users["user_id"].tolist()
+    for row, result in zip(users.itertuples(), results.to_dict("records")):
+        expected = benchmarker.compare_to_benchmark(
+            row.velocity, "velocity", {"role": row.role, "level": row.level}
+        )
+        for field in (
+            "user_value", "percentile_rank", "performance_level", "relative_position", "z_score",
+            "benchmark_level", "strengths", "improvement_areas", "recommendations"
+        ):
+            assert result[field] == expected[field], field
+
+
+def _comparable(benchmark):
+    comparable = dict(benchmark)
+    if "sorted_values" in comparable:
+        comparable["sorted_values"] = comparable["sorted_values"].tolist()
+    if "sketch" in comparable:
+        comparable["sketch"] = comparable["sketch"].to_dict()
+    return comparable
+
+
+@pytest.mark.parametrize("distribution", ["summary", "sorted", "sketch"])
+def test_create_benchmarks_matches_per_segment_benchmarks(distribution):
+    rng = np.random.default_rng(9)
+    data = pd.DataFrame({
+        "role": rng.choice(["dev", "qa", "pm"], 2000),
+        "level": rng.choice([1, 2, 3, 4], 2000),
+        "velocity": rng.gamma(4, 8, 2000),
+        "quality": rng.normal(70, 10, 2000),
+    })
+    # Nulls are dropped from the values but still count as data points
+    data.loc[rng.random(2000) < 0.1, "quality"] = np.nan
+    # A segment too small to benchmark
+    data.loc[data.index[:5], "role"] = "intern"
+
+    batch = PerformanceBenchmarker()
+    created = batch.create_benchmarks(data, ["velocity", "quality"], ["role", "level"], distribution=distribution)
+
+    single = PerformanceBenchmarker()
+    groups = data.groupby(["role", "level"]).size()
+    expected = [
+        single.create_benchmark(data, metric, {"role": role, "level": level}, distribution=distribution)
+        for (role, level), size in groups.items() if size >= 10
+        for metric in ("velocity", "quality")
+    ]
+
+    assert len(created) == len(expected) == 24
+    for benchmark in expected:
+        assert _comparable(batch.get_benchmark(benchmark["metric_name"], benchmark["segment"])) == _comparable(benchmark)
@@ -0,0 +1,42 @@
+"""Productivity predictor inputs"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.productivity_predictor import ProductivityPredictor
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    rng = np.random.default_rng(0)
+    names = ProductivityPredictor.FEATURE_SCHEMA.names
+    data = pd.DataFrame({name: rng.random(200) * 50 for name in names if name != 'is_weekend'})
+    data['day_of_week'] = rng.integers(1, 8, 200)
+    data['productivity_score'] = rng.random(200) * 100
+
+    model = ProductivityPredictor()
+    model.model.set_params(n_estimators=10)
+    model.train(data)
+    return model
+
+
+def test_null_column_values_count_as_missing(predictor):
+    columns = {
+        'engagement_score': [None, 80.0],
+        'hours_worked': [np.nan, 60.0],
+        'sentiment_score': [None, None]
+    }
+
+    results = predictor.predict_batch(columns)
+
+    assert len(results) == 2
+    assert results[0]['negative_factors'] == predictor.predict({})['negative_factors']
+    assert "Potential overwork" in results[1]['negative_factors']
+
+
+def test_training_rejects_missing_schema_columns():
+    data = pd.DataFrame({'commits_count': [1.0, 2.0, 3.0], 'productivity_score': [50.0, 60.0, 70.0]})
+
+    with pytest.raises(ValueError, match="missing from training"):
+        ProductivityPredictor().train(data)
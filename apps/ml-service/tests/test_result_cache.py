@@ -0,0 +1,18 @@
+"""Result cache isolation"""
+
+from models.result_cache import ResultCache
+
+
+def test_cached_results_are_isolated_from_callers():
+    cache = ResultCache("test")
+    result = {"topics": ["deadline"], "emotions": {"joy": 0.4}}
+
+    cache.set_many({"key": result})
+    result["topics"].append("meeting")
+
+    first = cache.get_many(["key"])["key"]
+    first["emotions"]["joy"] = 1.0
+    second = cache.get_many(["key"])["key"]
+
+    assert second == {"topics": ["deadline"], "emotions": {"joy": 0.4}}
+    assert first is not second
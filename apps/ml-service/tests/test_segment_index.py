@@ -0,0 +1,102 @@
+"""Segment hierarchy fallback"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.performance_benchmarker import PerformanceBenchmarker
+from models.segment_index import SegmentIndex
+
+
+def _benchmark(segment, sample_size=50):
+    return {'metric_name': 'velocity', 'segment': segment, 'sample_size': sample_size}
+
+
+@pytest.fixture
+def index():
+    index = SegmentIndex()
+    for segment in (
+        {},
+        {'role': 'dev'},
+        {'role': 'dev', 'department': 'eng'},
+        {'role': 'dev', 'department': 'eng', 'level': '3'},
+    ):
+        assert index.add(_benchmark(segment))
+    index.add(_benchmark({'role': 'qa'}, sample_size=4))
+    return index
+
+
+@pytest.mark.parametrize("segment,level", [
+    ({'role': 'dev', 'department': 'eng', 'level': 3}, ('role', 'department', 'level')),
+    ({'role': 'dev', 'department': 'eng', 'level': 5}, ('role', 'department')),
+    ({'role': 'dev', 'department': 'ops', 'level': 3}, ('role',)),
+    # The walk stops at the first missing dimension
+    ({'role': 'dev', 'level': 3}, ('role',)),
+    ({'role': 'pm', 'department': 'eng'}, ()),
+    ({'department': 'eng'}, ()),
+    (None, ()),
+])
+def test_resolve_falls_back_to_deepest_indexed_level(index, segment, level):
+    benchmark, found_level = index.resolve('velocity', segment, min_sample_size=10)
+
+    assert found_level == level
+    # Values match by string, so level 3 finds the benchmark stored as "3"
+    assert benchmark['segment'] == {dimension: str(segment[dimension]) for dimension in level}
+
+
+def test_resolve_passes_over_small_benchmarks(index):
+    benchmark, level = index.resolve('velocity', {'role': 'qa'}, min_sample_size=10)
+    assert level == () and benchmark['segment'] == {}
+
+    benchmark, level = index.resolve('velocity', {'role': 'qa'}, min_sample_size=1)
+    assert level == ('role',) and benchmark['segment'] == {'role': 'qa'}
+
+
+def test_non_prefix_segments_are_not_indexed(index):
+    assert not index.add(_benchmark({'department': 'eng'}))
+    assert index.resolve('other_metric', {'role': 'dev'}) == (None, None)
+
+
+@pytest.fixture
+def benchmarker():
+    rng = np.random.default_rng(4)
+    data = pd.DataFrame({
+        'role': rng.choice(['dev', 'qa'], 600),
+        'department': rng.choice(['eng', 'ops'], 600),
+        'level': rng.choice([1, 2, 3], 600),
+        'velocity': rng.normal(30, 8, 600),
+    })
+    benchmarker = PerformanceBenchmarker(min_sample_size=10)
+    benchmarker.create_benchmark(data, 'velocity')
+    benchmarker.create_benchmark(data, 'velocity', {'role': 'dev'})
+    benchmarker.create_benchmark(data, 'velocity', {'role': 'dev', 'department': 'eng'})
+    benchmarker.create_benchmark(data, 'velocity', {'role': 'dev', 'department': 'eng', 'level': 2})
+    return benchmarker
+
+
+@pytest.mark.parametrize("segment,level", [
+    ({'role': 'dev', 'department': 'eng', 'level': 2}, 'role+department+level'),
+    ({'role': 'dev', 'department': 'eng', 'level': 1}, 'role+department'),
+    ({'role': 'dev', 'department': 'ops', 'level': 2}, 'role'),
+    ({'role': 'qa', 'department': 'eng', 'level': 2}, 'global'),
+    (None, 'global'),
+])
+def test_compare_reports_benchmark_level(benchmarker, segment, level):
+    result = benchmarker.compare_to_benchmark(31.0, 'velocity', segment)
+
+    assert result['benchmark_level'] == level
+    expected_segment = benchmarker.resolve_benchmark('velocity', segment)['segment']
+    assert result['benchmark_segment'] == expected_segment
+
+
+def test_batch_compare_reports_benchmark_level(benchmarker):
+    users = pd.DataFrame({
+        'user_id': [1, 2, 3, 4],
+        'role': ['dev', 'dev', 'dev', 'qa'],
+        'department': ['eng', 'eng', 'ops', 'eng'],
+        'level': [2, 1, 2, 2],
+        'velocity': [31.0, 25.0, 40.0, 12.0],
+    })
+    results = benchmarker.batch_compare(users, 'velocity', ['role', 'department', 'level'])
+
+    assert results['benchmark_level'].tolist() == ['role+department+level', 'role+department', 'role', 'global']
@@ -0,0 +1,40 @@
+"""Sentiment analyzer batching and caching"""
+
+import pytest
+
+pytest.importorskip("transformers")
+pytest.importorskip("vaderSentiment")
+
+from models.result_cache import ResultCache
+from models.sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    # Skip model loading; only the dedupe and cache layer is exercised
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    analyzer.batch_size = 32
+    analyzer.cache = ResultCache("test")
+    analyzer.analyzed = []
+
+    def analyze_uncached(texts, batch_size):
+        analyzer.analyzed.extend(texts)
+        return [{"text": text, "topics": []} for text in texts]
+
+    analyzer._analyze_uncached = analyze_uncached
+    return analyzer
+
+
+def test_models_see_original_text(analyzer):
+    results = analyzer.batch_analyze(["thank\nyou", "thank  you", "thank you"])
+
+    assert analyzer.analyzed == ["thank\nyou"]
+    assert [result["text"] for result in results] == ["thank\nyou"] * 3
+
+
+def test_repeated_texts_get_separate_results(analyzer):
+    first, second = analyzer.batch_analyze(["done", "done"])
+    first["topics"].append("project")
+
+    assert second["topics"] == []
+    assert analyzer.batch_analyze(["done"])[0]["topics"] == []
@@ -0,0 +1,72 @@
+"""Sentiment request coalescing"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("transformers")
+pytest.importorskip("vaderSentiment")
+pytest.importorskip("pyod")
+
+from api.main import SentimentBatcher
+
+
+class _Executors:
+    """Records batch_analyze calls; texts starting with "fail" fail their batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def call(self, family, method, texts):
+        assert (family, method) == ("sentiment", "batch_analyze")
+        self.batches.append(list(texts))
+        await asyncio.sleep(0)
+        if any(text.startswith("fail") for text in texts):
+            raise RuntimeError("model error")
+        return [{"text": text} for text in texts]
+
+
+def test_concurrent_requests_share_one_batch():
+    executors = _Executors()
+    batcher = SentimentBatcher(executors, max_wait_ms=50, max_batch_size=32)
+    texts = [f"text {i}" for i in range(10)]
+
+    async def run():
+        return await asyncio.gather(*[batcher.analyze(text) for text in texts])
+
+    results = asyncio.run(run())
+
+    assert executors.batches == [texts]
+    assert [result["text"] for result in results] == texts
+
+
+def test_full_batches_are_split_by_size():
+    executors = _Executors()
+    batcher = SentimentBatcher(executors, max_wait_ms=50, max_batch_size=4)
+    texts = [f"text {i}" for i in range(10)]
+
+    async def run():
+        return await asyncio.gather(*[batcher.analyze(text) for text in texts])
+
+    results = asyncio.run(run())
+
+    assert [len(batch) for batch in executors.batches] == [4, 4, 2]
+    assert [result["text"] for result in results] == texts
+
+
+def test_errors_reach_only_their_batch():
+    executors = _Executors()
+    batcher = SentimentBatcher(executors, max_wait_ms=20, max_batch_size=32)
+
+    async def run():
+        failing = asyncio.gather(batcher.analyze("fail a"), batcher.analyze("b"), return_exceptions=True)
+        first = await failing
+        second = await asyncio.gather(batcher.analyze("c"), batcher.analyze("d"))
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in first)
+    assert [result["text"] for result in second] == ["c", "d"]
+    assert executors.batches == [["fail a", "b"], ["c", "d"]]
@@ -0,0 +1,112 @@
+"""NDJSON sentiment streaming endpoint"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("transformers")
+pytest.importorskip("vaderSentiment")
+pytest.importorskip("pyod")
+
+from api import main
+
+
+async def _fake_call(family, method, texts):
+    return [
+        {
+            "sentiment_score": float(len(text)),
+            "sentiment_label": "NEUTRAL",
+            "confidence": 1.0,
+            "emotions": {},
+            "dominant_emotion": None,
+            "topics": [],
+            "intent": None
+        }
+        for text in texts
+    ]
+
+
+def _post_stream(chunks):
+    """Drive the ASGI app with a request body split into chunks"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/ml/sentiment/stream",
+        "raw_path": b"/api/ml/sentiment/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    body = []
+    done = asyncio.Event()
+
+    async def receive():
+        # Yield between chunks so a concurrent reader would get a chance
+        # to steal them
+        await asyncio.sleep(0)
+        if messages:
+            return messages.pop(0)
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    asyncio.run(asyncio.wait_for(main.app(scope, receive, send), timeout=10))
+    return b"".join(body)
+
+
+def test_stream_returns_a_result_for_every_line(monkeypatch):
+    monkeypatch.setattr(main.executors, "call", _fake_call)
+    monkeypatch.setenv("SENTIMENT_STREAM_BATCH_SIZE", "7")
+
+    records = [{"id": i, "text": "x" * (i % 13 + 1)} for i in range(500)]
+    payload = b"".join(json.dumps(record).encode() + b"\n" for record in records)
+    # Uneven chunk size so records straddle chunk boundaries
+    chunks = [payload[i:i + 97] for i in range(0, len(payload), 97)]
+
+    lines = _post_stream(chunks).decode().splitlines()
+    results = [json.loads(line) for line in lines]
+
+    assert [result["id"] for result in results] == list(range(500))
+    assert all("error" not in result for result in results)
+    assert [result["sentiment_score"] for result in results] == [len(r["text"]) for r in records]
+
+
+def test_invalid_records_keep_their_id(monkeypatch):
+    monkeypatch.setattr(main.executors, "call", _fake_call)
+
+    lines = _post_stream([b'{"id": 1, "text": "ok"}\n{"id": 5}\nnot json\n[2]\n']).decode().splitlines()
+    results = [json.loads(line) for line in lines]
+
+    assert [result["id"] for result in results] == [1, 5, None, None]
+    assert "error" not in results[0]
+    assert all("error" in result for result in results[1:])
+
+
+def test_oversized_lines_are_dropped_with_an_error(monkeypatch):
+    monkeypatch.setattr(main.executors, "call", _fake_call)
+    monkeypatch.setenv("SENTIMENT_STREAM_MAX_LINE_BYTES", "64")
+
+    long_line = json.dumps({"id": 2, "text": "x" * 500}).encode()
+    payload = b'{"id": 1, "text": "a"}\n' + long_line + b'\n{"id": 3, "text": "b"}\n' + long_line
+    chunks = [payload[i:i + 20] for i in range(0, len(payload), 20)]
+
+    results = [json.loads(line) for line in _post_stream(chunks).decode().splitlines()]
+
+    assert [result["id"] for result in results] == [1, None, 3, None]
+    assert [("error" in result) for result in results] == [False, True, False, True]
@@ -0,0 +1,74 @@
+"""Compiled tree-ensemble inference"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest, RandomForestRegressor
+
+from models.productivity_predictor import ProductivityPredictor
+from models.tree_engine import CompiledTreeEnsemble
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((400, 6))
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.standard_normal(400)
+    return X, y
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0),
+    GradientBoostingRegressor(n_estimators=20, random_state=0),
+    IsolationForest(n_estimators=20, max_features=0.5, random_state=0),
+], ids=lambda model: type(model).__name__)
+def test_compiled_matches_sklearn(model, data):
+    X, y = data
+    model.fit(X, y)
+
+    engine = CompiledTreeEnsemble.from_sklearn(model)
+
+    assert engine.validate(model, X) <= 1e-6
+    assert engine.feature.dtype == engine.children.dtype == engine.roots.dtype == np.int32
+
+
+def test_loaded_engine_is_mapped_and_replaces_estimator(tmp_path):
+    rng = np.random.default_rng(1)
+    names = [name for name in ProductivityPredictor.FEATURE_SCHEMA.names if name != 'is_weekend']
+    training = pd.DataFrame({name: rng.random(300) * 50 for name in names})
+    training['productivity_score'] = rng.random(300) * 100
+
+    trained = ProductivityPredictor(use_compiled_engine=True)
+    trained.model.set_params(n_estimators=10)
+    trained.train(training)
+    path = str(tmp_path / "productivity.joblib")
+    trained.save_model(path)
+
+    served = ProductivityPredictor(use_compiled_engine=True)
+    served.load_model(path, mmap_mode="r")
+
+    assert served.model is None
+    assert all(isinstance(getattr(served.engine, name), np.memmap) for name in ('feature', 'children', 'roots'))
+
+    records = training.drop(columns=['productivity_score']).head(50).to_dict('records')
+    expected = [result['predicted_score'] for result in trained.predict_batch(records)]
+    assert [result['predicted_score'] for result in served.predict_batch(records)] == expected
+
+
+def test_retraining_after_loading_an_engine(tmp_path):
+    rng = np.random.default_rng(2)
+    names = [name for name in ProductivityPredictor.FEATURE_SCHEMA.names if name != 'is_weekend']
+    training = pd.DataFrame({name: rng.random(200) * 50 for name in names})
+    training['productivity_score'] = rng.random(200) * 100
+
+    trained = ProductivityPredictor(use_compiled_engine=True)
+    trained.train(training)
+    path = str(tmp_path / "productivity.joblib")
+    trained.save_model(path)
+
+    served = ProductivityPredictor(use_compiled_engine=True)
+    served.load_model(path)
+    metrics = served.train(training)
+
+    assert served.model is not None and served.engine is not None
+    assert metrics['train_r2'] == pytest.approx(trained.train(training)['train_r2'])